@@ -0,0 +1,61 @@
+'''
+Асинхронные варианты эндпоинтов чтения для запуска под ASGI.
+
+В Django 3.2 нет асинхронного ORM, поэтому запрос к БД и сериализация
+выполняются синхронным представлением DRF в пуле потоков. В отличие от
+обычных синхронных представлений под ASGI, которые Django выполняет
+в одном потоке (thread_sensitive), здесь запросы к БД идут параллельно,
+а событийный цикл не блокируется. Поведение (права, фильтры, пагинация,
+кеш и ETag) совпадает с /api/v1/.
+'''
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from .views import FeedViewSet, JournalViewSet, PostViewSet, UserListView
+
+
+def database_sync_to_async(func):
+    '''
+    sync_to_async в общем пуле потоков. Соединения с БД в потоках пула
+    не закрываются сигналом request_finished, поэтому устаревшие
+    соединения закрываются до и после вызова.
+    '''
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(wrapper, thread_sensitive=False)
+
+
+def async_read_view(view):
+    '''
+    Оборачивает представление DRF в асинхронное. Ответ рендерится
+    в том же потоке, что и запрос к БД.
+    '''
+    @database_sync_to_async
+    def render(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return await render(request, *args, **kwargs)
+
+    return async_view
+
+
+post_list = async_read_view(PostViewSet.as_view({'get': 'list'}))
+post_detail = async_read_view(PostViewSet.as_view({'get': 'retrieve'}))
+journal_list = async_read_view(JournalViewSet.as_view({'get': 'list'}))
+journal_detail = async_read_view(
+    JournalViewSet.as_view({'get': 'retrieve'}))
+feed = async_read_view(FeedViewSet.as_view({'get': 'list'}))
+user_search = async_read_view(UserListView.as_view())
@@ -0,0 +1,179 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+# Клеймы, которые ClaimsTokenObtainPairSerializer кладёт в токен.
+USER_CLAIMS = ('username', 'is_active')
+
+
+class UserCache:
+    '''
+    Потокобезопасный LRU-кеш пользователей с ограничением размера и TTL.
+    Если задан CACHE_ALIAS, промахи дополнительно проверяются в кеше
+    Django, общем для всех процессов. delete() записывает туда же новую
+    версию пользователя, и локальные записи других процессов с прежней
+    версией перестают читаться: один запрос к общему кешу на попадание.
+    '''
+    key_format = 'jwt-user:{}'
+    version_key_format = 'jwt-user-version:{}'
+
+    def __init__(self, max_size, ttl, cache_alias=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def get(self, user_id):
+        version = self.shared_version(user_id)
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is not None:
+                user, expires, item_version = item
+                if expires > time.monotonic() and item_version == version:
+                    self._items.move_to_end(user_id)
+                    return user
+                del self._items[user_id]
+        if self.shared is not None:
+            user = self.shared.get(self.key_format.format(user_id))
+            if user is not None:
+                self._store(user_id, user, version)
+                return user
+        return None
+
+    def shared_version(self, user_id):
+        if self.shared is None:
+            return None
+        return self.shared.get(self.version_key_format.format(user_id))
+
+    def set(self, user_id, user):
+        self._store(user_id, user, self.shared_version(user_id))
+        if self.shared is not None:
+            self.shared.set(self.key_format.format(user_id), user, self.ttl)
+
+    def _store(self, user_id, user, version):
+        with self._lock:
+            self._items[user_id] = (user, time.monotonic() + self.ttl,
+                                    version)
+            self._items.move_to_end(user_id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, user_id):
+        with self._lock:
+            self._items.pop(user_id, None)
+        if self.shared is not None:
+            self.shared.delete(self.key_format.format(user_id))
+            # Версия живёт не меньше локальных записей, выданных до неё.
+            self.shared.set(self.version_key_format.format(user_id),
+                            uuid.uuid4().hex, self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+_user_cache = None
+
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        options = settings.JWT_USER_CACHE
+        _user_cache = UserCache(
+            max_size=options['MAX_SIZE'],
+            ttl=options['TTL'],
+            cache_alias=options.get('CACHE_ALIAS')
+        )
+    return _user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    '''
+    JWTAuthentication, которая берёт пользователя из UserCache и ходит
+    в БД только при промахе. Кеш сбрасывается сигналами api.signals
+    при сохранении и удалении пользователя.
+    '''
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification'))
+
+        cache = get_user_cache()
+        user = cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(user_id, user)
+        elif not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        # Копия, чтобы изменения request.user в одном запросе
+        # не попадали в объект, общий для всех запросов процесса.
+        return copy.copy(user)
+
+
+class ClaimsUser(TokenUser):
+    '''
+    Пользователь, построенный только по клеймам токена, без запроса к БД.
+    Полную модель User можно получить через get_full_user().
+    '''
+
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', False)
+
+    def get_full_user(self):
+        return CachedJWTAuthentication().get_user(self.token)
+
+
+class TokenUserJWTAuthentication(CachedJWTAuthentication):
+    '''
+    Для действий, перечисленных во view в `token_user_actions`,
+    request.user строится из клеймов токена (ClaimsUser) без обращения
+    к БД и кешу. Для остальных действий и для старых токенов без клеймов
+    загружается полный User, как в CachedJWTAuthentication.
+
+    Деактивация пользователя в таком режиме вступает в силу только
+    после истечения выданного токена.
+    '''
+
+    def authenticate(self, request):
+        self.view = request.parser_context.get('view')
+        return super().authenticate(request)
+
+    def wants_token_user(self):
+        view = getattr(self, 'view', None)
+        return getattr(view, 'action', None) in getattr(
+            view, 'token_user_actions', ())
+
+    def get_user(self, validated_token):
+        if not self.wants_token_user() or not all(
+                claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification'))
+        user = ClaimsUser(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,51 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+VERSION_KEY = 'api-response:version:{}'
+
+
+def get_response_cache():
+    return caches[settings.API_RESPONSE_CACHE['ALIAS']]
+
+
+def get_versions(scopes):
+    '''
+    Текущие версии областей кеша. Начальная версия - время в мс,
+    чтобы после потери ключа версии старые ответы не стали актуальными.
+    '''
+    cache = get_response_cache()
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = cache.get_or_set(
+                key, int(time.time() * 1000), None)
+    return [versions[key] for key in keys]
+
+
+def bump_version(*scopes):
+    cache = get_response_cache()
+    for scope in scopes:
+        key = VERSION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), None)
+
+
+def build_key(request, basename, action, scopes):
+    versions = '.'.join(str(version) for version in get_versions(scopes))
+    # Хост входит в ключ: ответы содержат абсолютные ссылки.
+    path = hashlib.md5(
+        f'{request.get_host()}{request.get_full_path()}'.encode()
+    ).hexdigest()
+    return f'api-response:{basename}:{action}:{versions}:{path}'
+
+
+def typeahead_key(prefix, limit):
+    digest = hashlib.md5(prefix.encode()).hexdigest()
+    return f'api-typeahead:{limit}:{digest}'
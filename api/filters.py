@@ -0,0 +1,17 @@
+from rest_framework import filters
+
+from posts.search import get_search_backend
+
+
+class PostSearchFilter(filters.SearchFilter):
+    '''
+    `?search=` по тексту постов через полнотекстовый бэкенд
+    из настройки POSTS_SEARCH_BACKEND вместо LIKE '%term%'.
+    Результаты упорядочены по релевантности.
+    '''
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        return get_search_backend().search(queryset, query)
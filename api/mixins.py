@@ -0,0 +1,145 @@
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date, quote_etag
+from rest_framework.response import Response
+
+from . import cache
+
+
+class ConditionalGetMixin:
+    '''
+    ETag для list и retrieve, Last-Modified - только для retrieve и только
+    если задан `last_modified_field`.
+
+    ETag списка строится по самой странице: id и `etag_fields` строк,
+    общее число и ссылки пагинатора. Поэтому удаление строки тоже меняет
+    ETag, а на страницах курсора не выполняется COUNT по всей выборке.
+    Last-Modified для списка не отдаётся: MAX(last_modified) не
+    меняется при удалении. Если If-None-Match совпадает, возвращается
+    304 без сериализации.
+    '''
+    last_modified_field = 'last_modified'
+    etag_fields = ('pk', 'last_modified')
+
+    def get_etag(self, request, *parts):
+        key = ':'.join(str(part) for part in (
+            request.user.pk, request.get_full_path(), *parts))
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def conditional_response(self, request, response_factory, etag,
+                             last_modified=None):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp)
+        response = not_modified or response_factory()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def get_page_signature(self, rows, paginated):
+        signature = []
+        if paginated:
+            signature += [getattr(self.paginator, 'count', None),
+                          self.paginator.get_next_link(),
+                          self.paginator.get_previous_link()]
+        signature += [
+            tuple(getattr(row, field) for field in self.etag_fields)
+            for row in rows
+        ]
+        return signature
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        paginated = page is not None
+        rows = page if paginated else list(queryset)
+
+        def response_factory():
+            serializer = self.get_serializer(rows, many=True)
+            if paginated:
+                return self.get_paginated_response(serializer.data)
+            return Response(serializer.data)
+
+        return self.conditional_response(
+            request, response_factory,
+            self.get_etag(request,
+                          *self.get_page_signature(rows, paginated))
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = (getattr(instance, self.last_modified_field)
+                         if self.last_modified_field else None)
+        return self.conditional_response(
+            request,
+            lambda: Response(self.get_serializer(instance).data),
+            self.get_etag(request, *(getattr(instance, field)
+                                     for field in self.etag_fields)),
+            last_modified
+        )
+
+
+class AnonymousCacheMixin:
+    '''
+    Кеширует ответы list и retrieve для анонимных клиентов: они видят
+    только публичные записи, и ответ одинаков для всех.
+
+    Ключ содержит версии областей из `cache_scopes`; сигналы api.signals
+    увеличивают версию области при изменении Post или Journal, и старые
+    ответы перестают читаться. Хранятся данные ответа и заголовки
+    ETag/Last-Modified, поэтому условные запросы работают и для попаданий.
+    '''
+    cache_scopes = ()
+    cached_headers = ('ETag', 'Last-Modified', 'Vary')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(AnonymousCacheMixin, self).list(
+                request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(AnonymousCacheMixin, self).retrieve(
+                request, *args, **kwargs)
+        )
+
+    def cached_response(self, request, response_factory):
+        if request.user.is_authenticated \
+                or 'HTTP_AUTHORIZATION' in request.META:
+            return response_factory()
+
+        response_cache = cache.get_response_cache()
+        key = cache.build_key(request, self.basename, self.action,
+                              self.cache_scopes)
+        cached = response_cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            last_modified = headers.get('Last-Modified')
+            not_modified = get_conditional_response(
+                request,
+                etag=headers.get('ETag'),
+                last_modified=(parse_http_date(last_modified)
+                               if last_modified else None)
+            )
+            response = not_modified or Response(data)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        response = response_factory()
+        if response.status_code == 200:
+            headers = {
+                name: response[name] for name in self.cached_headers
+                if response.has_header(name)
+            }
+            response_cache.set(key, (response.data, headers),
+                               settings.API_RESPONSE_CACHE['TIMEOUT'])
+        return response
@@ -0,0 +1,229 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import and_, or_
+
+import coreapi
+import coreschema
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import exceptions
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination,
+                                       LimitOffsetPagination,
+                                       _positive_int)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    '''
+    Пагинация по ключу (keyset): следующая страница выбирается условием
+    по значениям полей сортировки последней строки, а не через OFFSET,
+    поэтому страница N стоит столько же, сколько первая. COUNT(*) не
+    выполняется.
+
+    Сортировка берётся из атрибута `ordering` представления, если он
+    задан, иначе из `Meta.ordering` модели. `id` добавляется в конец как
+    уникальный тай-брейкер. Выборку, отсортированную по аннотации
+    (релевантность `?search=`), курсор не листает: запрос получает 400.
+    '''
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 100
+    max_limit = 1000
+    tiebreaker = 'id'
+    invalid_cursor_message = 'Некорректный курсор.'
+    annotated_ordering_message = (
+        'Курсор нельзя сочетать с сортировкой по релевантности (search).')
+
+    def get_ordering(self, queryset, view=None):
+        ordering = list(getattr(view, 'ordering', None)
+                        or queryset.model._meta.ordering)
+        names = [field.lstrip('-') for field in ordering]
+        if self.tiebreaker not in names:
+            ordering.append(self.tiebreaker)
+        return ordering
+
+    def check_ordering(self, queryset):
+        annotations = queryset.query.annotations
+        for field in queryset.query.order_by:
+            if isinstance(field, str) and field.lstrip('-') in annotations:
+                raise exceptions.ValidationError(
+                    {self.cursor_query_param:
+                     [self.annotated_ordering_message]})
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param],
+                strict=True,
+                cutoff=self.max_limit
+            )
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': int(reverse)},
+                             default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request, queryset):
+        '''
+        Значения курсора приводятся к типам полей сортировки: подделанный
+        курсор даёт 404, а не ошибку в запросе к БД.
+        '''
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values, reverse = payload['v'], bool(payload['r'])
+            if not isinstance(values, list) \
+                    or len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.to_python(queryset.model, field, value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def to_python(self, model, field, value):
+        if value is None or isinstance(value, (list, dict)):
+            raise ValueError
+        return model._meta.get_field(field.lstrip('-')).to_python(value)
+
+    def get_keyset_filter(self, values, reverse):
+        '''
+        Строит условие "строго после `values`" для составного ключа:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND id > z).
+        '''
+        conditions = []
+        for position, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            descending = field.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = [
+                Q(**{previous.lstrip('-'): value})
+                for previous, value in zip(self.ordering[:position], values)
+            ]
+            condition = Q(**{f'{name}__{lookup}': values[position]})
+            conditions.append(reduce(and_, equal, condition))
+        return reduce(or_, conditions)
+
+    def get_row_values(self, row):
+        values = []
+        for field in self.ordering:
+            value = getattr(row, field.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat')
+                          else value)
+        return values
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.check_ordering(queryset)
+        self.ordering = self.get_ordering(queryset, view)
+        self.limit = self.get_limit(request)
+        values, reverse = self.decode_cursor(request, queryset)
+
+        order_by = self.ordering
+        if reverse:
+            order_by = [
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in self.ordering
+            ]
+        queryset = queryset.order_by(*order_by)
+        if values is not None:
+            queryset = queryset.filter(self.get_keyset_filter(values, reverse))
+
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+
+        self.next_values = self.previous_values = None
+        if results:
+            if has_more or reverse:
+                self.next_values = self.get_row_values(results[-1])
+            if values is not None and (has_more or not reverse):
+                self.previous_values = self.get_row_values(results[0])
+        return results
+
+    def get_link(self, values, reverse):
+        if values is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param,
+                                   self.encode_cursor(values, reverse))
+
+    def get_next_link(self):
+        return self.get_link(self.next_values, False)
+
+    def get_previous_link(self):
+        return self.get_link(self.previous_values, True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class OptionalKeysetPagination(LimitOffsetPagination):
+    '''
+    По умолчанию ведёт себя как LimitOffsetPagination. Если в запросе
+    передан параметр `cursor` (для первой страницы — пустой, `?cursor=`),
+    включается KeysetPagination.
+    '''
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_previous_link()
+        return super().get_previous_link()
+
+    def get_schema_fields(self, view):
+        return super().get_schema_fields(view) + [
+            coreapi.Field(
+                name=self.keyset_class.cursor_query_param,
+                required=False,
+                location='query',
+                schema=coreschema.String(
+                    title='Cursor',
+                    description='Курсор keyset-пагинации.'
+                )
+            )
+        ]
@@ -0,0 +1,36 @@
+import io
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import JSONParser
+
+
+class PayloadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Слишком большое тело запроса.'
+    default_code = 'payload_too_large'
+
+
+class LimitedJSONParser(JSONParser):
+    '''
+    JSONParser с ограничением размера тела `JSON_BODY_MAX_SIZE`. DRF
+    читает поток запроса сам, и DATA_UPLOAD_MAX_MEMORY_SIZE Django
+    к JSON-запросам не применяется.
+    '''
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        max_size = settings.JSON_BODY_MAX_SIZE
+        request = (parser_context or {}).get('request')
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (AttributeError, ValueError):
+            length = 0
+        if length > max_size:
+            raise PayloadTooLarge()
+        # Длина может быть не указана, поэтому поток читается с запасом
+        # в один байт.
+        body = stream.read(max_size + 1)
+        if len(body) > max_size:
+            raise PayloadTooLarge()
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -1,25 +1,128 @@
-from posts.models import Post, Follow, Journal
+from posts.models import ExportJob, Post, Follow, Journal
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from rest_framework.relations import SlugRelatedField
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from djoser.serializers import UserSerializer
 import base64
-from django.core.files.base import ContentFile
+import binascii
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
 
 User = get_user_model()
 
 
 class Base64ImageField(serializers.ImageField):
+    '''
+    Изображение в виде data URI (`data:image/png;base64,...`) или файла
+    multipart. Base64 декодируется кусками во временный файл на диске:
+    ImageField открывает его по пути, а хранилище перемещает без
+    копирования в память. Формат проверяется по сигнатуре первого
+    куска, размер - до декодирования. Размер ограничен настройкой
+    `IMAGE_UPLOAD_MAX_SIZE`, тело JSON-запроса - `JSON_BODY_MAX_SIZE`.
+    '''
+    default_error_messages = {
+        'invalid_base64': 'Некорректные данные base64.',
+        'unsupported_image': 'Неподдерживаемый формат изображения.',
+        'too_large': 'Размер изображения не должен превышать '
+                     '{max_size} байт.',
+    }
+    # Кратно 4, чтобы каждый кусок декодировался независимо.
+    chunk_size = 64 * 1024
+    signatures = (
+        (b'\x89PNG\r\n\x1a\n', 'png'),
+        (b'\xff\xd8\xff', 'jpg'),
+        (b'GIF87a', 'gif'),
+        (b'GIF89a', 'gif'),
+        (b'BM', 'bmp'),
+    )
+
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
-            ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+            data = self.decode_data_uri(data)
+        elif getattr(data, 'size', None) is not None:
+            self.check_size(data.size)
+
+        return super().to_internal_value(data)
+
+    def check_size(self, size):
+        if size > settings.IMAGE_UPLOAD_MAX_SIZE:
+            self.fail('too_large', max_size=settings.IMAGE_UPLOAD_MAX_SIZE)
+
+    def sniff_extension(self, head):
+        for signature, ext in self.signatures:
+            if head.startswith(signature):
+                return ext
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            return 'webp'
+        self.fail('unsupported_image')
+
+    def decode_chunk(self, chunk):
+        try:
+            return base64.b64decode(chunk, validate=True)
+        except (binascii.Error, ValueError):
+            self.fail('invalid_base64')
 
+    def decode_data_uri(self, data):
+        header, separator, _ = data[:100].partition(';base64,')
+        if not separator:
+            self.fail('invalid_base64')
+        # Переносы строк (base64.encodebytes, MIME) убираются до деления
+        # на куски, иначе границы кусков не кратны 4.
+        payload = ''.join(data[len(header) + len(separator):].split())
+        encoded_size = len(payload)
+        self.check_size(encoded_size // 4 * 3 - payload.count('=', -2))
+
+        head = self.decode_chunk(payload[:self.chunk_size])
+        ext = self.sniff_extension(head)
+        upload = TemporaryUploadedFile(
+            f'temp.{ext}', f'image/{ext}', encoded_size // 4 * 3, None)
+        try:
+            upload.write(head)
+            for offset in range(self.chunk_size, encoded_size,
+                                self.chunk_size):
+                upload.write(self.decode_chunk(
+                    payload[offset:offset + self.chunk_size]))
+        except serializers.ValidationError:
+            upload.close()
+            raise
+        upload.size = upload.tell()
+        upload.seek(0)
+        self.close_with_request(upload)
+        return upload
+
+    def close_with_request(self, upload):
+        '''
+        Django закрывает файлы request.FILES после ответа. Без этого
+        временный файл, перемещённый хранилищем, удалял бы финализатор
+        tempfile с FileNotFoundError.
+        '''
+        request = self.context.get('request')
+        if request is not None:
+            getattr(request, '_request', request).FILES.appendlist(
+                self.field_name, upload)
+
+
+class JournalField(serializers.PrimaryKeyRelatedField):
+    '''
+    Журнал поста по id. Если в контексте передан словарь `journals`
+    (id -> Journal), журнал берётся из него без запроса к БД.
+    '''
+
+    def to_internal_value(self, data):
+        journals = self.context.get('journals')
+        if journals is not None:
+            try:
+                return journals[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
         return super().to_internal_value(data)
 
 
 class PostSerializer(serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
+    journal = JournalField(queryset=Journal.objects.all())
     image = Base64ImageField(required=False, allow_null=True)
 
     def validate(self, attrs):
@@ -57,12 +160,16 @@ class JournalSerializer(serializers.ModelSerializer):
             'last_modified',
             'author',
             'image',
+            'image_thumbnail',
+            'image_medium',
             'is_private',
             'pin',
-            'is_pin_set'
+            'is_pin_set',
+            'post_count'
         ]
-        read_only_fields = ['pub_date',
-                            'last_modified', 'author', 'is_pin_set']
+        read_only_fields = ['pub_date', 'last_modified', 'author',
+                            'image_thumbnail', 'image_medium', 'is_pin_set',
+                            'post_count']
 
     def get_is_pin_set(self, obj):
         return obj.pin_code is not None
@@ -97,7 +204,7 @@ class JournalSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         pin = validated_data.pop('pin', None)
-        journal = Journal.objects.create(**validated_data)
+        journal = Journal(**validated_data)
         journal.set_pin(pin)
         journal.save()
         return journal
@@ -129,3 +236,60 @@ class FollowSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('user', 'following')
         model = Follow
+
+
+class UserProfileSerializer(UserSerializer):
+    '''
+    Пользователь со счётчиками подписок из Profile. Профиль нужно
+    подгружать через select_related('profile').
+    '''
+    followers_count = serializers.SerializerMethodField()
+    following_count = serializers.SerializerMethodField()
+
+    class Meta(UserSerializer.Meta):
+        fields = tuple(UserSerializer.Meta.fields) + (
+            'followers_count', 'following_count')
+
+    def get_followers_count(self, obj):
+        profile = getattr(obj, 'profile', None)
+        return profile.followers_count if profile else 0
+
+    def get_following_count(self, obj):
+        profile = getattr(obj, 'profile', None)
+        return profile.following_count if profile else 0
+
+
+class OwnJournalField(serializers.PrimaryKeyRelatedField):
+    def get_queryset(self):
+        return Journal.objects.filter(author=self.context['request'].user)
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    journal = OwnJournalField(required=False, allow_null=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = ('id', 'journal', 'export_format', 'status', 'error',
+                  'created', 'finished', 'download_url')
+        read_only_fields = ('status', 'error', 'created', 'finished')
+
+    def get_download_url(self, obj):
+        if obj.status != ExportJob.DONE:
+            return None
+        return reverse('export-download', kwargs={'pk': obj.pk},
+                       request=self.context['request'])
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    '''
+    Добавляет в токены username и is_active, чтобы
+    TokenUserJWTAuthentication могла обойтись без запроса к БД.
+    '''
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['is_active'] = user.is_active
+        return token
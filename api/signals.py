@@ -0,0 +1,37 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts.models import (Journal, Post, image_variants_generated,
+                          posts_bulk_created)
+
+from . import cache
+from .authentication import get_user_cache
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    get_user_cache().delete(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(posts_bulk_created, sender=Post)
+@receiver(image_variants_generated, sender=Post)
+def invalidate_post_responses(sender, **kwargs):
+    # После коммита: иначе параллельный запрос закеширует старые данные
+    # под новой версией.
+    transaction.on_commit(partial(cache.bump_version, 'post'))
+
+
+@receiver(post_save, sender=Journal)
+@receiver(post_delete, sender=Journal)
+@receiver(image_variants_generated, sender=Journal)
+def invalidate_journal_responses(sender, **kwargs):
+    transaction.on_commit(partial(cache.bump_version, 'journal'))
@@ -0,0 +1,34 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class PinCheckThrottle(SimpleRateThrottle):
+    '''
+    Ограничивает неудачные проверки PIN для пары журнал/клиент.
+
+    Успешные проверки лимит не расходуют: история пополняется только
+    через record_failure(), который вызывает view после неверного PIN.
+    '''
+    scope = 'pin_check'
+
+    def get_cache_key(self, request, view):
+        if request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': f"{view.kwargs.get('pk')}:{ident}"
+        }
+
+    def throttle_success(self):
+        return True
+
+    def record_failure(self, request, view):
+        self.key = self.get_cache_key(request, view)
+        self.now = self.timer()
+        self.history = [
+            moment for moment in self.cache.get(self.key, [])
+            if moment > self.now - self.duration
+        ]
+        self.history.insert(0, self.now)
+        self.cache.set(self.key, self.history, self.duration)
@@ -1,12 +1,31 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import include, path
-from .views import JournalViewSet, PostViewSet, FollowViewSet, JournalExportAPIView, UserListView
+from . import async_views
+from .views import (JournalViewSet, PostViewSet, FollowViewSet,
+                    JournalExportAPIView, UserListView, ExportJobViewSet,
+                    FeedViewSet, ClaimsTokenObtainPairView,
+                    UserTypeaheadView, MetricsView)
 
 
+# Эндпоинты чтения для ASGI, см. api/async_views.py.
+async_urlpatterns = [
+    path('posts/', async_views.post_list, name='async-post-list'),
+    path('posts/<int:pk>/', async_views.post_detail,
+         name='async-post-detail'),
+    path('journals/', async_views.journal_list, name='async-journal-list'),
+    path('journals/<int:pk>/', async_views.journal_detail,
+         name='async-journal-detail'),
+    path('feed/', async_views.feed, name='async-feed'),
+    path('users/search/', async_views.user_search,
+         name='async-user-search'),
+]
+
 router = DefaultRouter()
 router.register('posts', PostViewSet, basename='post')
 router.register(r'journals', JournalViewSet, basename='journal')
 router.register('follow', FollowViewSet, basename='follow')
+router.register('exports', ExportJobViewSet, basename='export')
+router.register('feed', FeedViewSet, basename='feed')
 
 urlpatterns = [
     path('v1/', include(router.urls)),
@@ -16,6 +35,15 @@ urlpatterns = [
         name='journal-export'
     ),
     path('v1/users/search/', UserListView.as_view(), name='user-search'),
+    path('v1/users/typeahead/', UserTypeaheadView.as_view(),
+         name='user-typeahead'),
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
     path('v1/', include('djoser.urls')),
+    path(
+        'v1/jwt/create/',
+        ClaimsTokenObtainPairView.as_view(),
+        name='jwt-create'
+    ),
     path('v1/', include('djoser.urls.jwt')),
+    path('async/v1/', include(async_urlpatterns)),
 ]
@@ -1,101 +1,214 @@
+from urllib.parse import quote
+
 from rest_framework import serializers, generics
-from django.db import IntegrityError
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from rest_framework import viewsets, exceptions
 from django.contrib.auth import get_user_model
-from posts.models import Journal, Post
+from posts.exports import generate_export
+from posts.models import ExportJob, Journal, Post, Profile, TimelineEntry
+from posts.tasks import run_in_background
 from .serializers import (PostSerializer,
                           FollowSerializer,
-                          JournalSerializer)
+                          JournalSerializer,
+                          ExportJobSerializer,
+                          ClaimsTokenObtainPairSerializer,
+                          UserProfileSerializer)
+from .filters import PostSearchFilter
+from .cache import get_response_cache, typeahead_key
+from .mixins import AnonymousCacheMixin, ConditionalGetMixin
+from .pagination import OptionalKeysetPagination
+from .throttling import PinCheckThrottle
 from rest_framework import mixins
 from rest_framework import filters
 from rest_framework import permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
 from rest_framework.decorators import action
-from djoser.serializers import UserSerializer
+from rest_framework.pagination import _positive_int
+from rest_framework_simplejwt.views import TokenObtainPairView
+from journals import metrics
 
 
 User = get_user_model()
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(AnonymousCacheMixin, ConditionalGetMixin,
+                  viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
-    filter_backends = (filters.SearchFilter, DjangoFilterBackend,)
+    pagination_class = OptionalKeysetPagination
+    filter_backends = (PostSearchFilter, DjangoFilterBackend,)
     search_fields = ('text',)
     filterset_fields = ('author__username', 'journal')
+    # Для этих действий request.user строится из клеймов JWT без БД.
+    token_user_actions = ('list',)
+    # Видимость постов зависит и от приватности журнала.
+    cache_scopes = ('post', 'journal')
 
-    def get_queryset(self):
-        if not self.request.user.is_authenticated:
-            return Post.objects.filter(is_private=False)
-        user = self.request.user
-        queryset = Post.objects.filter(
-            Q(author=user) | Q(author__isnull=False, is_private=False)
-        ).distinct()
+    # Колонки, которые читает PostSerializer: автор нужен только ради
+    # username, журнал отдаётся как id и не подгружается.
+    serialized_fields = ('id', 'text', 'pub_date', 'last_modified', 'image',
+                         'image_thumbnail', 'image_medium', 'is_private',
+                         'journal', 'author', 'author__username')
+
+    legacy_ordering = ('-pub_date', 'text', 'id')
 
+    @property
+    def ordering(self):
+        if settings.POSTS_LEGACY_TEXT_ORDERING:
+            return self.legacy_ordering
+        return None
+
+    def get_queryset(self):
+        queryset = Post.objects.visible_to(self.request.user).select_related(
+            'author').only(*self.serialized_fields)
+        if self.ordering:
+            queryset = queryset.order_by(*self.ordering)
         return queryset
 
     def perform_create(self, serializer):
         journal = serializer.validated_data.get('journal')
-        if journal.author != self.request.user:
+        if journal.author_id != self.request.user.id:
             raise exceptions.PermissionDenied(
                 'Добавлять посты можно только в свои журналы!')
         serializer.save(author=self.request.user)
 
     def perform_update(self, serializer):
-        if serializer.instance.author != self.request.user:
+        if serializer.instance.author_id != self.request.user.id:
             raise exceptions.PermissionDenied(
                 'Изменение чужого контента запрещено!')
         serializer.save(author=self.request.user)
 
     def perform_destroy(self, serializer):
         instance = self.get_object()
-        if instance.author != self.request.user:
+        if instance.author_id != self.request.user.id:
             raise exceptions.PermissionDenied(
                 'Удаление чужого контента запрещено!')
         instance.delete()
 
+    @action(detail=False, methods=['post'], url_path='bulk',
+            url_name='bulk')
+    def bulk_create(self, request):
+        '''
+        Создаёт список постов одним запросом и одной транзакцией.
+        Ошибки возвращаются по каждому элементу с его индексом,
+        при любой ошибке ничего не создаётся.
+        '''
+        if not isinstance(request.data, list) or not request.data:
+            raise serializers.ValidationError(
+                {"detail": "Ожидается непустой список постов."})
+        if len(request.data) > settings.POSTS_BULK_CREATE_MAX:
+            raise serializers.ValidationError({
+                "detail": "За один запрос можно создать не более "
+                          f"{settings.POSTS_BULK_CREATE_MAX} постов."
+            })
+
+        journal_ids = set()
+        for item in request.data:
+            try:
+                journal_ids.add(int(item.get('journal')))
+            except (AttributeError, TypeError, ValueError):
+                pass
+        journals = Journal.objects.in_bulk(journal_ids)
+
+        context = dict(self.get_serializer_context(), journals=journals)
+        serializer = self.get_serializer(
+            data=request.data, many=True, context=context)
+        if not serializer.is_valid():
+            return Response(
+                {"errors": [
+                    {"index": index, "errors": errors}
+                    for index, errors in enumerate(serializer.errors)
+                    if errors
+                ]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-class JournalViewSet(viewsets.ModelViewSet):
+        foreign = [
+            index for index, item in enumerate(serializer.validated_data)
+            if item['journal'].author_id != request.user.id
+        ]
+        if foreign:
+            return Response(
+                {"errors": [
+                    {"index": index,
+                     "errors": {"journal": [
+                         'Добавлять посты можно только в свои журналы!']}}
+                    for index in foreign
+                ]},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        posts = []
+        for item in serializer.validated_data:
+            post = Post(author=request.user, **item)
+            if post.journal.is_private:
+                post.is_private = True
+            posts.append(post)
+        with transaction.atomic():
+            posts = Post.objects.bulk_create(posts)
+
+        return Response(
+            self.get_serializer(posts, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class JournalViewSet(AnonymousCacheMixin, ConditionalGetMixin,
+                     viewsets.ModelViewSet):
     queryset = Journal.objects.all()
     serializer_class = JournalSerializer
+    pagination_class = OptionalKeysetPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_fields = ('author__username',)
+    token_user_actions = ('list',)
+    # Счётчик постов меняется вместе с постами, а last_modified журнала
+    # при этом остаётся прежним: Last-Modified не отдаётся, ETag
+    # учитывает post_count.
+    cache_scopes = ('journal', 'post')
+    etag_fields = ('pk', 'last_modified', 'post_count')
+    last_modified_field = None
+
+    serialized_fields = ('id', 'title', 'description', 'pub_date',
+                         'last_modified', 'image', 'image_thumbnail',
+                         'image_medium', 'is_private', 'pin_code',
+                         'post_count', 'author', 'author__username')
 
     def get_queryset(self):
-        if not self.request.user.is_authenticated:
-            return Journal.objects.filter(is_private=False)
-        user = self.request.user
-        queryset = Journal.objects.filter(
-            Q(author=user) | Q(author__isnull=False, is_private=False)
-        ).distinct()
-
-        return queryset
+        return Journal.objects.visible_to(self.request.user).select_related(
+            'author').only(*self.serialized_fields)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
     def perform_update(self, serializer):
-        if serializer.instance.author != self.request.user:
+        if serializer.instance.author_id != self.request.user.id:
             raise exceptions.PermissionDenied(
                 'Изменение чужого контента запрещено!')
         serializer.save(author=self.request.user)
 
     def perform_destroy(self, serializer):
         instance = self.get_object()
-        if instance.author != self.request.user:
+        if instance.author_id != self.request.user.id:
             raise exceptions.PermissionDenied(
                 'Удаление чужого контента запрещено!')
         instance.delete()
 
-    @action(detail=True, methods=['post'], url_path='check-pin', url_name='check-pin')
+    @action(detail=True, methods=['post'], url_path='check-pin',
+            url_name='check-pin', throttle_classes=[PinCheckThrottle])
     def check_pin(self, request, pk=None):
+        '''
+        Проверяет PIN и выдаёт токен, который можно передавать вместо
+        PIN в поле `token`, чтобы не хешировать PIN повторно.
+        Неудачные попытки ограничены настройкой `pin_check`.
+        '''
         journal = self.get_object()
         pin = request.data.get('pin', '')
+        token = request.data.get('token')
 
         if not journal.is_private:
             return Response(
@@ -103,9 +216,16 @@ class JournalViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if token and journal.check_pin_token(token, request.user.pk):
+            return Response({'valid': True, 'token': token})
+
         if journal.check_pin(pin):
-            return Response({'valid': True})
+            return Response({
+                'valid': True,
+                'token': journal.make_pin_token(request.user.pk)
+            })
 
+        PinCheckThrottle().record_failure(request, self)
         return Response({'valid': False}, status=status.HTTP_403_FORBIDDEN)
 
 
@@ -134,49 +254,191 @@ class FollowViewSet(CreateListViewSet):
             )
 
 
+class FeedViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    '''
+    Лента публичных постов авторов, на которых подписан пользователь,
+    от новых к старым. Читается из предрассчитанной таблицы TimelineEntry.
+    '''
+    serializer_class = PostSerializer
+    pagination_class = OptionalKeysetPagination
+    permission_classes = (permissions.IsAuthenticated,)
+    token_user_actions = ('list',)
+
+    def get_queryset(self):
+        post_fields = tuple(
+            f'post__{field}' for field in PostViewSet.serialized_fields)
+        return TimelineEntry.objects.filter(
+            user_id=self.request.user.pk, post__is_private=False
+        ).select_related('post__author').only(
+            'id', 'pub_date', 'post', *post_fields)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        entries = page if page is not None else queryset
+        serializer = self.get_serializer(
+            [entry.post for entry in entries], many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+
 class JournalExportAPIView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
+    # Сколько постов читать из БД за один проход курсора.
+    chunk_size = 2000
 
     def get(self, request, pk):
         try:
-            journal = Journal.objects.get(pk=pk)
+            journal = Journal.objects.select_related('author').get(pk=pk)
         except Journal.DoesNotExist:
             return Response(
                 {"error": "Journal not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        if journal.author != request.user:
+        if journal.author_id != request.user.id:
             return Response(
                 {"error": "Access denied"},
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        content = [
+        response = StreamingHttpResponse(
+            self.stream_content(journal), content_type='text/plain')
+        response['Content-Disposition'] = self.content_disposition(
+            f'{journal.title}_export.txt')
+        return response
+
+    def content_disposition(self, filename):
+        # Как FileResponse: не-ASCII имя передаётся через filename*.
+        try:
+            filename.encode('ascii')
+        except UnicodeEncodeError:
+            return f"attachment; filename*=utf-8''{quote(filename)}"
+        filename = filename.replace('\\', '\\\\').replace('"', '\\"')
+        return f'attachment; filename="{filename}"'
+
+    def stream_content(self, journal):
+        yield '\n'.join([
             f"Дневник: {journal.title}",
             f"Описание: {journal.description or '-'}",
             f"Создан: {journal.pub_date.strftime('%d.%m.%Y %H:%M')}",
             f"Изменен: {journal.last_modified.strftime('%d.%m.%Y %H:%M')}",
             f"Автор: {journal.author.username}",
             "\nЗаписи:"
-        ]
-
-        for i, post in enumerate(journal.posts.all().order_by('pub_date'), 1):
-            content.append(
-                f"{i}. {post.text}\n"
+        ])
+
+        # journal_id нужен менеджеру journal.posts, чтобы проставить
+        # известный журнал без запроса на каждый пост.
+        posts = journal.posts.only('text', 'pub_date', 'journal').order_by(
+            'pub_date', 'id').iterator(chunk_size=self.chunk_size)
+        for i, post in enumerate(posts, 1):
+            yield (
+                f"\n{i}. {post.text}\n"
                 f"Дата создания: {post.pub_date.strftime('%d.%m.%Y %H:%M')}\n"
             )
 
-        response = HttpResponse('\n'.join(content), content_type='text/plain')
-        response['Content-Disposition'] = f'attachment; filename="{journal.title}_export.txt"'
-        return response
+
+class ExportJobViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                       mixins.ListModelMixin, viewsets.GenericViewSet):
+    '''
+    Выгрузки журнала или всего аккаунта (JSONL, CSV, Markdown, ZIP
+    с изображениями). Файл формируется фоновой задачей, статус
+    проверяется через GET, готовый файл отдаётся через download.
+    '''
+    serializer_class = ExportJobSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.request.user.export_jobs.all()
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save(user=request.user)
+        run_in_background(generate_export, job.pk)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'], url_path='download',
+            url_name='download')
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != ExportJob.DONE:
+            return Response(
+                {"detail": "Выгрузка ещё не готова."},
+                status=status.HTTP_409_CONFLICT
+            )
+        return FileResponse(job.file.open('rb'), as_attachment=True,
+                            filename=job.file.name.split('/')[-1])
+
+
+class ClaimsTokenObtainPairView(TokenObtainPairView):
+    serializer_class = ClaimsTokenObtainPairSerializer
 
 
 class UserListView(generics.ListAPIView):
     '''
     ViewSet для поиска пользователей
     '''
-    serializer_class = UserSerializer
-    queryset = User.objects.all()
+    serializer_class = UserProfileSerializer
+    queryset = User.objects.select_related('profile')
     filter_backends = [filters.SearchFilter]
     search_fields = ['^username']
+
+
+class UserTypeaheadView(APIView):
+    '''
+    Подсказки пользователей по началу имени без учёта регистра.
+    Ищет диапазоном по индексу Profile.username_lower, отдаёт
+    [{id, username}] без пагинации, популярные префиксы кешируются
+    на `USER_TYPEAHEAD['CACHE_TIMEOUT']` секунд.
+    '''
+    permission_classes = (permissions.AllowAny,)
+    authentication_classes = ()
+
+    def get_limit(self, request):
+        config = settings.USER_TYPEAHEAD
+        try:
+            return _positive_int(request.query_params['limit'], strict=True,
+                                 cutoff=config['MAX_LIMIT'])
+        except (KeyError, ValueError):
+            return config['LIMIT']
+
+    def get(self, request):
+        config = settings.USER_TYPEAHEAD
+        prefix = request.query_params.get('q', '').strip().lower()
+        if not config['MIN_LENGTH'] <= len(prefix) <= 150:
+            return Response([])
+        limit = self.get_limit(request)
+
+        cache = get_response_cache()
+        key = typeahead_key(prefix, limit)
+        results = cache.get(key)
+        if results is None:
+            # Все строки с префиксом лежат в [prefix, prefix с
+            # увеличенным последним символом).
+            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            users = Profile.objects.filter(
+                username_lower__gte=prefix, username_lower__lt=upper
+            ).order_by('username_lower').values_list(
+                'user_id', 'user__username')[:limit]
+            results = [{'id': pk, 'username': username}
+                       for pk, username in users]
+            cache.set(key, results, config['CACHE_TIMEOUT'])
+        return Response(results)
+
+
+class MetricsView(APIView):
+    '''
+    Гистограммы метрик запросов этого процесса в текстовом формате
+    Prometheus. Только для администраторов и только при включённых
+    замерах.
+    '''
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        if settings.PERFORMANCE_METRICS['SAMPLE_RATE'] <= 0:
+            raise exceptions.NotFound()
+        return HttpResponse(metrics.export(),
+                            content_type='text/plain; version=0.0.4; '
+                                         'charset=utf-8')
@@ -0,0 +1,204 @@
+'''
+Задержка, пропускная способность и число запросов к БД по эндпоинтам
+API на синтетических данных. Результат пишется в JSON, два отчёта
+сравниваются через benchmarks.compare.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.api --posts 100000 --output before.json
+
+Запросы выполняются тестовым клиентом Django в одном процессе, от имени
+пользователя с подписками. Кеши очищаются перед каждым запросом, чтобы
+измерялась работа с БД, а не попадание в кеш.
+'''
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'journals.settings')
+django.setup()
+
+from django.core.cache import caches  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import (CaptureQueriesContext,  # noqa: E402
+                               setup_test_environment)
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from benchmarks import data  # noqa: E402
+from posts.models import Follow, Journal, Post  # noqa: E402
+
+# Имя, метод, URL (с подстановками из context()), тело запроса.
+SCENARIOS = (
+    ('post-list', 'get', '/api/v1/posts/?limit=100', None),
+    ('post-list-cursor', 'get', '/api/v1/posts/?cursor=&limit=100', None),
+    ('post-list-deep-offset', 'get',
+     '/api/v1/posts/?limit=100&offset={deep_offset}', None),
+    ('post-list-journal', 'get',
+     '/api/v1/posts/?journal={journal}&limit=100', None),
+    ('post-list-author', 'get',
+     '/api/v1/posts/?author__username={username}&limit=100', None),
+    ('post-search', 'get', '/api/v1/posts/?search=прогулка&limit=100', None),
+    ('post-detail', 'get', '/api/v1/posts/{post}/', None),
+    ('journal-list', 'get', '/api/v1/journals/?limit=100', None),
+    ('journal-detail', 'get', '/api/v1/journals/{journal}/', None),
+    ('journal-export', 'get', '/api/v1/journals/{journal}/export/', None),
+    ('check-pin', 'post', '/api/v1/journals/{pin_journal}/check-pin/',
+     {'pin': data.PIN}),
+    ('follow-list', 'get', '/api/v1/follow/?limit=100', None),
+    ('feed', 'get', '/api/v1/feed/?limit=100', None),
+    ('user-search', 'get', '/api/v1/users/search/?search=user1&limit=100',
+     None),
+    ('user-typeahead', 'get', '/api/v1/users/typeahead/?q=user1', None),
+)
+
+
+def context():
+    '''Пользователь с наибольшим числом подписок и его объекты.'''
+    follow = Follow.objects.values('user_id').annotate(
+        total=Count('id')).order_by('-total').first()
+    user_id = follow['user_id'] if follow else Journal.objects.values_list(
+        'author_id', flat=True).first()
+    journal = Journal.objects.filter(author_id=user_id).order_by(
+        '-post_count').first()
+    pin_journal = Journal.objects.filter(
+        author_id=user_id, is_private=True, pin_code__isnull=False).first()
+    if pin_journal is None:
+        pin_journal = Journal.objects.create(
+            title='PIN', author_id=user_id, is_private=True)
+        pin_journal.set_pin(data.PIN)
+        pin_journal.save()
+    return {
+        'user_id': user_id,
+        'username': data.User.objects.get(pk=user_id).username,
+        'journal': journal.pk,
+        'pin_journal': pin_journal.pk,
+        'post': Post.objects.filter(author_id=user_id).values_list(
+            'pk', flat=True).first(),
+        'deep_offset': max(Post.objects.count() // 2, 0),
+    }
+
+
+def request(client, method, url, body):
+    if body is None:
+        response = getattr(client, method)(url)
+    else:
+        response = getattr(client, method)(
+            url, data=json.dumps(body), content_type='application/json')
+    content = (b''.join(response.streaming_content)
+               if response.streaming else response.content)
+    return response.status_code, len(content)
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+def measure(client, method, url, body, repeat, warmup):
+    for _ in range(warmup):
+        request(client, method, url, body)
+    timings, queries = [], []
+    for _ in range(repeat):
+        clear_caches()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            status, size = request(client, method, url, body)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+    timings.sort()
+    return {
+        'method': method.upper(),
+        'url': url,
+        'status': status,
+        'response_bytes': size,
+        'queries': max(queries),
+        'p50_ms': round(statistics.median(timings), 3),
+        # Ближайший ранг: при двух замерах это максимум, а не минимум.
+        'p95_ms': round(timings[math.ceil(len(timings) * 95 / 100) - 1], 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'max_ms': round(timings[-1], 3),
+        'rps': round(1000 * len(timings) / sum(timings), 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--journals', type=int, default=5000)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--follows', type=int, default=20,
+                        help='Среднее число подписок на пользователя.')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='*', metavar='SCENARIO',
+                        help='Запустить только указанные сценарии.')
+    parser.add_argument('--output', default='benchmark.json')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        dataset = data.generate(args.users, args.journals, args.posts,
+                                args.follows, seed=args.seed)
+        print(f'Данные созданы за {time.perf_counter() - started:.1f} с')
+
+        values = context()
+        token = AccessToken.for_user(data.User.objects.get(
+            pk=values['user_id']))
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        results = {}
+        for name, method, url, body in SCENARIOS:
+            if args.only and name not in args.only:
+                continue
+            results[name] = measure(client, method, url.format(**values),
+                                    body, args.repeat, args.warmup)
+            result = results[name]
+            print(f'{name:24} {result["status"]} '
+                  f'p50 {result["p50_ms"]:9.2f} мс  '
+                  f'p95 {result["p95_ms"]:9.2f} мс  '
+                  f'{result["rps"]:8.1f} запр/с  '
+                  f'запросов к БД {result["queries"]}')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'dataset': dataset,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f'Отчёт: {args.output}')
+
+
+if __name__ == '__main__':
+    main()
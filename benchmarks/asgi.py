@@ -0,0 +1,148 @@
+'''
+Пропускная способность эндпоинтов чтения при конкурентной нагрузке:
+WSGI в пуле потоков, ASGI с синхронными представлениями (/api/v1/)
+и ASGI с асинхронными (/api/async/v1/).
+
+Запуск из корня проекта:
+
+    python -m benchmarks.asgi --requests 2000 --concurrency 50
+
+Приложения вызываются в процессе, без HTTP-сервера, поэтому результат
+показывает накладные расходы Django и БД, а не сети.
+'''
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'journals.settings')
+django.setup()
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from benchmarks.visibility import User, populate  # noqa: E402
+
+ENDPOINTS = ('posts/?limit=100', 'journals/?limit=100', 'feed/?limit=100',
+             'users/search/?search=user1')
+
+
+def split(path):
+    path, _, query = path.partition('?')
+    return path, query
+
+
+def wsgi_call(application, path, token):
+    path, query = split(path)
+    environ = {'PATH_INFO': path, 'QUERY_STRING': query,
+               'HTTP_HOST': 'testserver',
+               'HTTP_AUTHORIZATION': f'Bearer {token}',
+               'wsgi.input': io.BytesIO()}
+    setup_testing_defaults(environ)
+    statuses = []
+    body = application(environ, lambda status, headers: statuses.append(
+        status))
+    b''.join(body)
+    return int(statuses[0].split()[0])
+
+
+async def asgi_call(application, path, token):
+    path, query = split(path)
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'server': ('testserver', 80),
+        'client': ('127.0.0.1', 0),
+        'headers': [(b'host', b'testserver'),
+                    (b'authorization', f'Bearer {token}'.encode())],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]['status']
+
+
+def run_wsgi(application, path, token, requests, concurrency):
+    def timed(_):
+        started = time.perf_counter()
+        status = wsgi_call(application, path, token)
+        return status, time.perf_counter() - started
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        return list(executor.map(timed, range(requests)))
+
+
+async def run_asgi(application, path, token, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed():
+        async with semaphore:
+            started = time.perf_counter()
+            status = await asgi_call(application, path, token)
+            return status, time.perf_counter() - started
+
+    return await asyncio.gather(*(timed() for _ in range(requests)))
+
+
+def report(label, path, results, elapsed):
+    timings = sorted(duration * 1000 for _, duration in results)
+    errors = sum(1 for status, _ in results if status != 200)
+    print(f'{label:11} {path:42} {len(results) / elapsed:8.1f} запр/с, '
+          f'медиана {statistics.median(timings):7.2f} мс, '
+          f'p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} мс, '
+          f'ошибок {errors}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--journals', type=int, default=5000)
+    parser.add_argument('--posts', type=int, default=50000)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        populate(args.users, args.journals, args.posts, 0.2, args.seed)
+        token = str(AccessToken.for_user(User.objects.first()))
+        wsgi = get_wsgi_application()
+        asgi = get_asgi_application()
+
+        for endpoint in ENDPOINTS:
+            for label, prefix in (('WSGI', '/api/v1/'),
+                                  ('ASGI sync', '/api/v1/'),
+                                  ('ASGI async', '/api/async/v1/')):
+                path = prefix + endpoint
+                started = time.perf_counter()
+                if label == 'WSGI':
+                    results = run_wsgi(wsgi, path, token, args.requests,
+                                       args.concurrency)
+                else:
+                    results = asyncio.run(run_asgi(
+                        asgi, path, token, args.requests, args.concurrency))
+                report(label, path, results, time.perf_counter() - started)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
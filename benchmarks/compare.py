@@ -0,0 +1,63 @@
+'''
+Сравнение двух отчётов benchmarks.api.
+
+    python -m benchmarks.compare before.json after.json --threshold 0.2
+
+Регрессия - рост p50 больше порога (доля) или рост числа запросов к БД.
+При регрессиях команда завершается с кодом 1.
+'''
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def compare(before, after, threshold):
+    rows, regressions = [], []
+    for name, new in after['results'].items():
+        old = before['results'].get(name)
+        if old is None:
+            rows.append((name, None, new['p50_ms'], None, None,
+                         new['queries'], 'новый'))
+            continue
+        change = (new['p50_ms'] - old['p50_ms']) / old['p50_ms'] \
+            if old['p50_ms'] else 0
+        notes = []
+        if change > threshold:
+            notes.append('медленнее')
+        if new['queries'] > old['queries']:
+            notes.append('больше запросов')
+        if notes:
+            regressions.append(name)
+        rows.append((name, old['p50_ms'], new['p50_ms'], change,
+                     old['queries'], new['queries'], ', '.join(notes)))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    print(f'{before["meta"]["commit"]} -> {after["meta"]["commit"]}')
+    rows, regressions = compare(before, after, args.threshold)
+    for name, old, new, change, old_queries, new_queries, note in rows:
+        old = f'{old:9.2f}' if old is not None else ' ' * 9
+        change = f'{change:+7.1%}' if change is not None else ' ' * 7
+        old_queries = old_queries if old_queries is not None else '-'
+        print(f'{name:24} p50 {old} -> {new:9.2f} мс {change}  '
+              f'запросов {old_queries} -> {new_queries}  {note}')
+    if regressions:
+        print(f'Регрессии: {", ".join(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
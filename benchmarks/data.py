@@ -0,0 +1,26 @@
+'''
+Синтетические данные для бенчмарков. Генерация - posts.seeding, здесь
+только параметры по умолчанию и ANALYZE после загрузки.
+'''
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from posts.models import Follow
+from posts.seeding import PIN, Seeder  # noqa: F401
+
+User = get_user_model()
+
+
+def generate(users, journals, posts, follows, private_share=0.2,
+             pin_share=0.5, seed=0):
+    '''
+    `follows` - среднее число подписок на пользователя. Возвращает
+    словарь с параметрами генерации.
+    '''
+    Seeder(seed=seed, private_share=private_share, pin_share=pin_share,
+           image_share=0, prefix='user').run(users, journals, posts, follows)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return {'users': users, 'journals': journals, 'posts': posts,
+            'follows': Follow.objects.count(), 'private_share': private_share,
+            'pin_share': pin_share, 'seed': seed}
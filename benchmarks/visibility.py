@@ -0,0 +1,114 @@
+'''
+Сравнение старого плана видимости (OR + DISTINCT) с visible_to().
+
+Запуск из корня проекта:
+
+    python -m benchmarks.visibility --posts 1000000 --journals 100000
+
+База создаётся как тестовая (для SQLite — в памяти) и удаляется в конце.
+'''
+import argparse
+import os
+import random
+import statistics
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'journals.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Q  # noqa: E402
+
+from posts.models import Journal, Post  # noqa: E402
+
+User = get_user_model()
+
+BATCH_SIZE = 10000
+
+
+def populate(users, journals, posts, private_share, seed):
+    rng = random.Random(seed)
+    with transaction.atomic():
+        User.objects.bulk_create(
+            (User(username=f'user{number}') for number in range(users)),
+            batch_size=BATCH_SIZE
+        )
+        user_ids = list(User.objects.values_list('id', flat=True))
+        Journal.objects.bulk_create(
+            (Journal(title=f'Журнал {number}',
+                     author_id=rng.choice(user_ids),
+                     is_private=rng.random() < private_share)
+             for number in range(journals)),
+            batch_size=BATCH_SIZE
+        )
+        journal_rows = list(
+            Journal.objects.values_list('id', 'author_id', 'is_private'))
+        for start in range(0, posts, BATCH_SIZE):
+            batch = []
+            for number in range(start, min(start + BATCH_SIZE, posts)):
+                journal_id, author_id, is_private = rng.choice(journal_rows)
+                batch.append(Post(text=f'Пост {number}', author_id=author_id,
+                                  journal_id=journal_id,
+                                  is_private=is_private))
+            Post.objects.bulk_create(batch)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def legacy_visible(model, user):
+    return model.objects.filter(
+        Q(author=user) | Q(author__isnull=False, is_private=False)
+    ).distinct()
+
+
+def measure(action, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--journals', type=int, default=100000)
+    parser.add_argument('--posts', type=int, default=1000000)
+    parser.add_argument('--private-share', type=float, default=0.2)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--page', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        populate(args.users, args.journals, args.posts,
+                 args.private_share, args.seed)
+        print(f'Данные созданы за {time.perf_counter() - started:.1f} с: '
+              f'{args.posts} постов, {args.journals} журналов')
+
+        user = User.objects.order_by('?').first()
+        for model in (Post, Journal):
+            for label, factory in (
+                ('OR + DISTINCT', lambda: legacy_visible(model, user)),
+                ('visible_to', lambda: model.objects.visible_to(user)),
+            ):
+                for query, action in (
+                    ('page', lambda: list(factory()[:args.page])),
+                    ('count', lambda: factory().count()),
+                ):
+                    median, worst = measure(action, args.repeat)
+                    print(f'{model.__name__:8} {label:14} {query:6} '
+                          f'медиана {median:8.2f} мс, '
+                          f'максимум {worst:8.2f} мс')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
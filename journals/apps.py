@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class JournalsConfig(AppConfig):
+    '''Инструментирование проекта: журнал медленных запросов.'''
+    name = 'journals'
+
+    def ready(self):
+        from . import slow_queries  # noqa: F401
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from journals import slow_queries
+
+ORDERINGS = {
+    'total': lambda group: group['total_ms'],
+    'count': lambda group: group['count'],
+    'max': lambda group: group['max_ms'],
+    'mean': lambda group: group['total_ms'] / group['count'],
+}
+
+
+class Command(BaseCommand):
+    help = ('Сводка журнала медленных запросов: самые дорогие запросы, '
+            'сгруппированные по отпечатку.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=None,
+                            help='Файл журнала, по умолчанию '
+                                 "SLOW_QUERY_LOG['PATH'].")
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--order-by', choices=ORDERINGS,
+                            default='total')
+        parser.add_argument('--view', default=None,
+                            help='Только запросы этого представления.')
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.SLOW_QUERY_LOG['PATH']
+        try:
+            entries = list(slow_queries.read(path))
+        except FileNotFoundError:
+            raise CommandError(f'Журнал {path} не найден.')
+
+        groups = {}
+        for entry in entries:
+            if options['view'] and entry['view'] != options['view']:
+                continue
+            group = groups.setdefault(entry['fingerprint'], {
+                'count': 0, 'total_ms': 0, 'max_ms': 0, 'views': set(),
+                'sql': entry['sql'], 'plan': entry['plan'],
+            })
+            group['count'] += 1
+            group['total_ms'] += entry['duration_ms']
+            if entry['duration_ms'] >= group['max_ms']:
+                group['max_ms'] = entry['duration_ms']
+                group['plan'] = entry['plan']
+            group['views'].add(entry['view'] or '-')
+
+        top = sorted(groups.items(), key=lambda item: ORDERINGS[
+            options['order_by']](item[1]), reverse=True)[:options['top']]
+        if not top:
+            self.stdout.write('Медленных запросов нет.')
+        for fingerprint, group in top:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{fingerprint}: {group["count"]} раз, всего '
+                f'{group["total_ms"]:.1f} мс, среднее '
+                f'{group["total_ms"] / group["count"]:.1f} мс, максимум '
+                f'{group["max_ms"]:.1f} мс'))
+            self.stdout.write(
+                f'  Представления: {", ".join(sorted(group["views"]))}')
+            self.stdout.write(f'  {group["sql"]}')
+            for step in group['plan'] or ():
+                self.stdout.write(f'    {step}')
@@ -0,0 +1,96 @@
+'''
+Гистограммы метрик запросов в памяти процесса и их выгрузка
+в текстовом формате Prometheus. У каждого воркера свои значения.
+'''
+import bisect
+import threading
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _labels(pairs):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                # Попадания по корзинам (последняя - +Inf) и сумма.
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][index] += 1
+            series[1] += value
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+
+    def export(self):
+        lines = [f'# HELP {self.name} {self.description}',
+                 f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = [(key, list(counts), total)
+                      for key, (counts, total) in sorted(self.series.items())]
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                labels = _labels((*key, ('le', bound)))
+                lines.append(f'{self.name}_bucket{{{labels}}} {cumulative}')
+            labels = _labels(key)
+            lines.append(f'{self.name}_sum{{{labels}}} {_number(total)}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    'journals_request_duration_seconds',
+    'Время обработки запроса.', DURATION_BUCKETS)
+DB_QUERIES = Histogram(
+    'journals_request_db_queries',
+    'Число запросов к БД за запрос.', QUERY_BUCKETS)
+DB_DURATION = Histogram(
+    'journals_request_db_duration_seconds',
+    'Время запросов к БД за запрос.', DURATION_BUCKETS)
+RENDER_DURATION = Histogram(
+    'journals_request_render_duration_seconds',
+    'Время сериализации ответа в JSON.', DURATION_BUCKETS)
+RESPONSE_SIZE = Histogram(
+    'journals_response_size_bytes',
+    'Размер тела ответа.', SIZE_BUCKETS)
+
+HISTOGRAMS = (REQUEST_DURATION, DB_QUERIES, DB_DURATION, RENDER_DURATION,
+              RESPONSE_SIZE)
+
+
+def export():
+    return '\n'.join(
+        line for histogram in HISTOGRAMS for line in histogram.export()
+    ) + '\n'
+
+
+def reset():
+    for histogram in HISTOGRAMS:
+        histogram.reset()
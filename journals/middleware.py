@@ -0,0 +1,109 @@
+import random
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from . import metrics
+from .slow_queries import current_view
+
+
+class RequestMetrics:
+    '''Замеры одного запроса, заодно execute_wrapper для подсчёта SQL.'''
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = 'unknown'
+        self.queries = 0
+        self.db_time = 0.0
+        self.view_started = self.view_done = None
+        self.render_started = self.render_done = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def rendered(self, response):
+        self.render_done = time.perf_counter()
+
+    def phases(self, finished):
+        '''Длительности в секундах: total, db, app (код представления
+        без SQL), render.'''
+        phases = {'total': finished - self.started, 'db': self.db_time}
+        if self.view_started is not None and self.view_done is not None:
+            phases['app'] = max(
+                self.view_done - self.view_started - self.db_time, 0)
+        if self.render_done is not None:
+            phases['render'] = self.render_done - self.render_started
+        return phases
+
+
+class PerformanceMiddleware:
+    '''
+    Собирает время запроса, число и время SQL-запросов, время рендеринга
+    ответа DRF и размер ответа в гистограммы journals.metrics. Замеряется
+    доля запросов `PERFORMANCE_METRICS['SAMPLE_RATE']`, остальные
+    проходят без обёрток. При DEBUG замеры отдаются в Server-Timing.
+    Имя представления всегда ставится в slow_queries.current_view.
+
+    SQL считается только в потоке запроса: запросы async-представлений,
+    выполняемые в пуле потоков, сюда не попадают.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def sampled(self):
+        rate = settings.PERFORMANCE_METRICS['SAMPLE_RATE']
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def __call__(self, request):
+        token = current_view.set(None)
+        try:
+            if not self.sampled():
+                return self.get_response(request)
+            request.performance = measured = RequestMetrics()
+            with connection.execute_wrapper(measured):
+                response = self.get_response(request)
+            self.record(request, response, measured)
+            return response
+        finally:
+            current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = request.resolver_match.view_name or 'unknown'
+        current_view.set(view)
+        measured = getattr(request, 'performance', None)
+        if measured is not None:
+            measured.view = view
+            measured.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        measured = getattr(request, 'performance', None)
+        if measured is not None:
+            measured.view_done = measured.render_started = \
+                time.perf_counter()
+            response.add_post_render_callback(measured.rendered)
+        return response
+
+    def record(self, request, response, measured):
+        phases = measured.phases(time.perf_counter())
+        labels = {'view': measured.view, 'method': request.method}
+        metrics.REQUEST_DURATION.observe(phases['total'], **labels)
+        metrics.DB_QUERIES.observe(measured.queries, **labels)
+        metrics.DB_DURATION.observe(phases['db'], **labels)
+        if 'render' in phases:
+            metrics.RENDER_DURATION.observe(phases['render'], **labels)
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.observe(len(response.content), **labels)
+        if settings.DEBUG:
+            response['Server-Timing'] = ', '.join(
+                f'{name};dur={seconds * 1000:.2f}'
+                + (f';desc="{measured.queries} queries"' if name == 'db'
+                   else '')
+                for name, seconds in phases.items()
+            )
@@ -28,9 +28,11 @@ INSTALLED_APPS = [
     'djoser',
     'api',
     'posts',
+    'journals.apps.JournalsConfig',
 ]
 
 MIDDLEWARE = [
+    'journals.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -71,6 +73,14 @@ DATABASES = {
     }
 }
 
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'posts.hashers.PinPBKDF2PasswordHasher',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -105,9 +115,18 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.TokenUserJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.LimitedJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        # Неудачные проверки PIN одного журнала одним клиентом.
+        'pin_check': '5/min',
+    },
 }
 
 SIMPLE_JWT = {
@@ -116,6 +135,44 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# /users/me/ отдаёт счётчики подписок. Список /users/ остаётся без них:
+# djoser не подгружает профили, и каждый стоил бы отдельного запроса.
+DJOSER = {
+    'SERIALIZERS': {
+        'current_user': 'api.serializers.UserProfileSerializer',
+    },
+}
+
+
+# 'api' - кеш ответов для анонимных клиентов (api.mixins.AnonymousCacheMixin).
+# В продакшене - общий для процессов бэкенд, например
+# django.core.cache.backends.filebased.FileBasedCache или Redis.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-responses',
+    },
+}
+
+API_RESPONSE_CACHE = {
+    'ALIAS': 'api',
+    'TIMEOUT': 300,
+}
+
+# Кеш пользователей для api.authentication.CachedJWTAuthentication.
+# CACHE_ALIAS - алиас из CACHES для кеша, общего между процессами
+# (None - только локальный LRU процесса). С общим кешем сохранение или
+# удаление пользователя сразу видно всем процессам; без него другие
+# процессы видят изменения до TTL секунд спустя.
+JWT_USER_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 300,
+    'CACHE_ALIAS': None,
+}
+
 
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
@@ -124,5 +181,80 @@ CORS_ALLOWED_ORIGINS = [
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Алгоритм хеширования PIN-кодов журналов (из PASSWORD_HASHERS)
+# и срок жизни токена успешной проверки PIN в секундах.
+JOURNAL_PIN_HASHER = 'pbkdf2_sha256_pin'
+JOURNAL_PIN_TOKEN_MAX_AGE = 60 * 60
+
+# Полнотекстовый поиск по постам: для PostgreSQL -
+# 'posts.search.PostgresSearchBackend'.
+POSTS_SEARCH_BACKEND = 'posts.search.SQLiteFTS5SearchBackend'
+
+# Старая сортировка постов в API: ('-pub_date', 'text', 'id').
+# Не покрывается индексами, включать только для совместимости клиентов.
+POSTS_LEGACY_TEXT_ORDERING = False
+
+# Подсказки пользователей (/api/v1/users/typeahead/): минимальная длина
+# префикса, число результатов по умолчанию и максимум, время жизни
+# кеша префиксов в секундах.
+USER_TYPEAHEAD = {
+    'MIN_LENGTH': 1,
+    'LIMIT': 10,
+    'MAX_LIMIT': 20,
+    'CACHE_TIMEOUT': 30,
+}
+
+# Метрики запросов (journals.middleware, /api/v1/metrics/): доля
+# замеряемых запросов от 0 до 1 из переменной окружения
+# PERFORMANCE_SAMPLE_RATE. По умолчанию 0: middleware ничего не замеряет,
+# а /api/v1/metrics/ отвечает 404.
+PERFORMANCE_METRICS = {
+    'SAMPLE_RATE': float(os.environ.get('PERFORMANCE_SAMPLE_RATE', 0)),
+}
+
+# Журнал медленных SQL-запросов (journals.slow_queries): порог в мс,
+# файл JSON Lines и нужен ли план EXPLAIN. Выключен, пока не задана
+# переменная окружения SLOW_QUERY_THRESHOLD_MS.
+SLOW_QUERY_LOG = {
+    'THRESHOLD_MS': (float(os.environ['SLOW_QUERY_THRESHOLD_MS'])
+                     if os.environ.get('SLOW_QUERY_THRESHOLD_MS') else None),
+    'PATH': os.environ.get('SLOW_QUERY_LOG_PATH',
+                           str(BASE_DIR / 'logs' / 'slow_queries.jsonl')),
+    'EXPLAIN': os.environ.get('SLOW_QUERY_EXPLAIN', '1') == '1',
+}
+
+# Максимум постов в одном запросе POST /api/v1/posts/bulk/.
+POSTS_BULK_CREATE_MAX = 500
+
+# Лента подписок: сколько постов автора добавляется в ленту при
+# подписке, размер пачки вставки и число подписчиков, до которого
+# раскладка поста выполняется прямо в запросе, а не в фоне.
+FEED_BACKFILL_SIZE = 200
+FEED_BATCH_SIZE = 1000
+FEED_FANOUT_SYNC_LIMIT = 1000
+
+# Фоновые задачи (выгрузки) выполняются в пуле потоков процесса.
+# При BACKGROUND_TASKS_EAGER = True - синхронно, сразу после коммита.
+BACKGROUND_TASKS_EAGER = False
+BACKGROUND_TASKS_WORKERS = 2
+
+# Сколько постов выгрузка читает из БД за один проход курсора.
+EXPORT_BATCH_SIZE = 2000
+
+# Уменьшенные копии изображений постов и журналов: поле модели ->
+# максимальные ширина и высота. Строятся фоновой задачей.
+IMAGE_VARIANTS = {
+    'image_thumbnail': (200, 200),
+    'image_medium': (800, 800),
+}
+
+# Максимальный размер загружаемого изображения в байтах.
+IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+
+# Максимальный размер тела JSON-запроса в байтах (api.parsers), с
+# запасом на изображение в base64. Крупные файлы лучше передавать
+# через multipart.
+JSON_BODY_MAX_SIZE = 16 * 1024 * 1024
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
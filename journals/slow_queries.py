@@ -0,0 +1,128 @@
+'''
+Журнал медленных SQL-запросов. Если задан порог
+`SLOW_QUERY_LOG['THRESHOLD_MS']`, обёртка execute_wrapper ставится на
+каждое соединение (сигнал connection_created) и пишет запросы дольше
+порога в JSON Lines: отпечаток, текст без параметров, представление,
+из которого пришёл запрос, и план EXPLAIN. Сводка - manage.py
+slow_queries.
+'''
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Имя представления текущего запроса, ставит PerformanceMiddleware.
+current_view = ContextVar('current_view', default=None)
+
+_write_lock = threading.Lock()
+_explaining = threading.local()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'IN \(\?(?:, \?)*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize(sql):
+    '''Текст запроса без литералов: одинаковые по форме запросы совпадают.'''
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def explain(connection, sql, params):
+    '''
+    План запроса. Курсор бэкенда берётся напрямую, в обход обёрток
+    и журнала запросов Django, чтобы EXPLAIN не считался и не логировался.
+    '''
+    prefix = ('EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite'
+              else 'EXPLAIN')
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f'{prefix} {sql}', params)
+        return [' '.join(str(column) for column in row)
+                if connection.vendor != 'sqlite' else row[-1]
+                for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+
+    def __call__(self, execute, sql, params, many, context):
+        threshold = settings.SLOW_QUERY_LOG['THRESHOLD_MS']
+        if threshold is None or getattr(_explaining, 'active', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            if duration >= threshold:
+                self.record(context['connection'], sql, params, many,
+                            duration)
+
+    def record(self, connection, sql, params, many, duration):
+        config = settings.SLOW_QUERY_LOG
+        normalized = normalize(sql)
+        plan = None
+        if config['EXPLAIN'] and not many \
+                and sql.lstrip()[:6].upper() == 'SELECT':
+            _explaining.active = True
+            try:
+                plan = explain(connection, sql, params)
+            except Exception as error:
+                plan = [f'EXPLAIN не выполнен: {error}']
+            finally:
+                _explaining.active = False
+        entry = {
+            'time': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(duration, 3),
+            'view': current_view.get(),
+            'fingerprint': fingerprint(normalized),
+            'sql': normalized,
+            'plan': plan,
+            'database': connection.alias,
+        }
+        path = config['PATH']
+        with _write_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def install(connection):
+    if not any(isinstance(wrapper, SlowQueryLog)
+               for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(SlowQueryLog())
+
+
+@receiver(connection_created)
+def install_on_connect(sender, connection, **kwargs):
+    if settings.SLOW_QUERY_LOG['THRESHOLD_MS'] is not None:
+        install(connection)
+
+
+def read(path):
+    '''Записи журнала; битые строки (недописанные) пропускаются.'''
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
@@ -0,0 +1,98 @@
+import threading
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Follow, Journal, Post, Profile
+
+User = get_user_model()
+
+UPDATE_BATCH_SIZE = 900
+
+_deleting = threading.local()
+
+
+def being_deleted(model):
+    '''
+    pk объектов `model`, которые сейчас удаляются в этом потоке. Пока
+    журнал или пользователь в этом множестве, счётчики его каскадно
+    удаляемых постов и подписок не обновляются построчно.
+    '''
+    if not hasattr(_deleting, 'pks'):
+        _deleting.pks = defaultdict(set)
+    return _deleting.pks[model]
+
+
+def _add(field, delta):
+    return Greatest(F(field) + delta, 0)
+
+
+def change_post_counts(journal_deltas):
+    '''
+    Меняет Journal.post_count на величины из словаря journal_id -> delta.
+    Журналы с одинаковой delta обновляются одним запросом. Дата изменения
+    журнала не трогается: по ней сортируется список журналов.
+    '''
+    by_delta = defaultdict(list)
+    for journal_id, delta in journal_deltas.items():
+        if journal_id is not None and delta:
+            by_delta[delta].append(journal_id)
+    for delta, journal_ids in by_delta.items():
+        for start in range(0, len(journal_ids), UPDATE_BATCH_SIZE):
+            Journal.objects.filter(
+                pk__in=journal_ids[start:start + UPDATE_BATCH_SIZE]
+            ).update(post_count=_add('post_count', delta))
+
+
+def count_posts(posts):
+    return Counter(post.journal_id for post in posts)
+
+
+def change_follow_counts(user_id, following_id, delta):
+    Profile.objects.filter(user_id=user_id).update(
+        following_count=_add('following_count', delta))
+    Profile.objects.filter(user_id=following_id).update(
+        followers_count=_add('followers_count', delta))
+
+
+def uncount_user_follows(user_id):
+    '''
+    Перед удалением пользователя уменьшает счётчики тех, с кем он связан
+    подписками: два запроса вместо двух на каждую подписку.
+    '''
+    Profile.objects.filter(user__in=Follow.objects.filter(
+        user_id=user_id).values('following')).update(
+        followers_count=_add('followers_count', -1))
+    Profile.objects.filter(user__in=Follow.objects.filter(
+        following_id=user_id).values('user')).update(
+        following_count=_add('following_count', -1))
+
+
+def _count(queryset, field):
+    return Coalesce(
+        Subquery(queryset.values(field).annotate(total=Count('pk'))
+                 .values('total'), output_field=IntegerField()),
+        Value(0)
+    )
+
+
+def rebuild():
+    '''Создаёт недостающие профили и пересчитывает все счётчики.'''
+    Profile.objects.bulk_create(
+        [Profile(user_id=user_id, username_lower=username.lower())
+         for user_id, username in User.objects.filter(
+             profile__isnull=True).values_list('pk', 'username')],
+        batch_size=1000
+    )
+    Journal.objects.update(post_count=_count(
+        Post.objects.filter(journal=OuterRef('pk')).order_by(), 'journal'))
+    Profile.objects.update(
+        followers_count=_count(
+            Follow.objects.filter(following=OuterRef('user')).order_by(),
+            'following'),
+        following_count=_count(
+            Follow.objects.filter(user=OuterRef('user')).order_by(),
+            'user'),
+    )
@@ -0,0 +1,167 @@
+import csv
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .models import ExportJob, Journal
+
+CSV_COLUMNS = ('journal_id', 'journal_title', 'post_id', 'pub_date',
+               'is_private', 'text', 'image')
+
+
+def iter_journals(job):
+    if job.journal_id:
+        return Journal.objects.filter(pk=job.journal_id)
+    return job.user.journals.order_by('pub_date', 'id')
+
+
+def iter_posts(journal):
+    return journal.posts.only(
+        'id', 'text', 'pub_date', 'is_private', 'image', 'journal'
+    ).order_by('pub_date', 'id').iterator(
+        chunk_size=settings.EXPORT_BATCH_SIZE)
+
+
+def journal_record(journal):
+    return {
+        'type': 'journal',
+        'id': journal.id,
+        'title': journal.title,
+        'description': journal.description,
+        'pub_date': journal.pub_date.isoformat(),
+        'last_modified': journal.last_modified.isoformat(),
+        'is_private': journal.is_private,
+        'image': journal.image.name or None,
+    }
+
+
+def post_record(post):
+    return {
+        'type': 'post',
+        'id': post.id,
+        'journal': post.journal_id,
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'is_private': post.is_private,
+        'image': post.image.name or None,
+    }
+
+
+def write_jsonl(job, stream):
+    for journal in iter_journals(job):
+        stream.write(json.dumps(journal_record(journal),
+                                ensure_ascii=False) + '\n')
+        for post in iter_posts(journal):
+            stream.write(json.dumps(post_record(post),
+                                    ensure_ascii=False) + '\n')
+
+
+def write_csv(job, stream):
+    writer = csv.writer(stream)
+    writer.writerow(CSV_COLUMNS)
+    for journal in iter_journals(job):
+        for post in iter_posts(journal):
+            writer.writerow((
+                journal.id,
+                journal.title,
+                post.id,
+                post.pub_date.isoformat(),
+                post.is_private,
+                post.text,
+                post.image.name,
+            ))
+
+
+def write_markdown(job, stream):
+    for journal in iter_journals(job):
+        stream.write(f'# {journal.title}\n\n')
+        if journal.description:
+            stream.write(f'{journal.description}\n\n')
+        for post in iter_posts(journal):
+            stream.write(
+                f"## {post.pub_date.strftime('%d.%m.%Y %H:%M')}\n\n"
+                f'{post.text}\n\n'
+            )
+            if post.image:
+                stream.write(f'![](images/{post.image.name})\n\n')
+
+
+def iter_image_names(job):
+    for journal in iter_journals(job):
+        if journal.image:
+            yield journal.image.name
+        for post in iter_posts(journal):
+            if post.image:
+                yield post.image.name
+
+
+def write_zip(job, binary_stream):
+    with zipfile.ZipFile(binary_stream, 'w',
+                         compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, writer in (('export.jsonl', write_jsonl),
+                             ('export.md', write_markdown)):
+            with archive.open(name, 'w') as member:
+                with io.TextIOWrapper(member, encoding='utf-8') as text:
+                    writer(job, text)
+        written = set()
+        for name in iter_image_names(job):
+            # Несколько постов или журнал и пост могут ссылаться на один
+            # файл, в архив он попадает один раз.
+            if name in written:
+                continue
+            written.add(name)
+            try:
+                source = default_storage.open(name, 'rb')
+            except FileNotFoundError:
+                continue
+            with source, archive.open(f'images/{name}', 'w') as member:
+                shutil.copyfileobj(source, member)
+
+
+TEXT_WRITERS = {
+    ExportJob.JSONL: write_jsonl,
+    ExportJob.CSV: write_csv,
+    ExportJob.MARKDOWN: write_markdown,
+}
+
+
+def build_filename(job):
+    scope = f'journal_{job.journal_id}' if job.journal_id else 'account'
+    return f'{job.user.username}_{scope}_{job.pk}.{job.export_format}'
+
+
+def generate_export(job_id):
+    '''
+    Формирует файл выгрузки во временном файле, построчно читая посты
+    из БД, и сохраняет его в MEDIA_ROOT/exports/.
+    '''
+    job = ExportJob.objects.select_related('user').get(pk=job_id)
+    job.status = ExportJob.RUNNING
+    job.save(update_fields=['status'])
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            if job.export_format == ExportJob.ZIP:
+                write_zip(job, tmp)
+            else:
+                text = io.TextIOWrapper(tmp, encoding='utf-8', newline='')
+                TEXT_WRITERS[job.export_format](job, text)
+                text.flush()
+                text.detach()
+            tmp.seek(0)
+            job.file.save(build_filename(job), File(tmp), save=False)
+    except Exception as error:
+        job.status = ExportJob.FAILED
+        job.error = str(error)
+        job.finished = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished'])
+        raise
+    job.status = ExportJob.DONE
+    job.finished = timezone.now()
+    job.save(update_fields=['status', 'file', 'finished'])
@@ -0,0 +1,12 @@
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class PinPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    '''
+    PBKDF2 с меньшим числом итераций для коротких PIN-кодов журналов.
+    Перебор 4-6 цифр не усложняется заметно даже медленным хешем,
+    поэтому защиту обеспечивает ограничение неудачных попыток,
+    а не стоимость хеширования.
+    '''
+    algorithm = 'pbkdf2_sha256_pin'
+    iterations = 10000
@@ -0,0 +1,72 @@
+import io
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import image_variants_generated
+
+# Форматы без прозрачности: RGBA и палитру перед сохранением
+# нужно перевести в RGB.
+OPAQUE_FORMATS = ('JPEG',)
+
+
+def render_variant(image, size):
+    variant = image.copy()
+    variant.thumbnail(size, Image.LANCZOS)
+    image_format = image.format or 'PNG'
+    if image_format in OPAQUE_FORMATS and variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+    buffer = io.BytesIO()
+    variant.save(buffer, format=image_format, optimize=True)
+    return buffer.getvalue()
+
+
+def delete_variants(instance):
+    for field in settings.IMAGE_VARIANTS:
+        variant = getattr(instance, field)
+        if variant:
+            variant.delete(save=False)
+
+
+def generate_image_variants(model_label, pk):
+    '''
+    Строит уменьшенные копии изображения объекта по размерам из
+    `IMAGE_VARIANTS` и сохраняет их в поля вариантов через update(),
+    не вызывая save() и сигналы модели.
+    '''
+    model = apps.get_model(model_label)
+    fields = tuple(settings.IMAGE_VARIANTS)
+    instance = model.objects.filter(pk=pk).only('image', *fields).first()
+    if instance is None:
+        return
+    delete_variants(instance)
+    if not instance.image:
+        model.objects.filter(pk=pk).update(**dict.fromkeys(fields))
+        return
+
+    with instance.image.open('rb') as source:
+        image = Image.open(source)
+        image_format = image.format
+        image = ImageOps.exif_transpose(image)
+        image.format = image_format
+
+    stem, ext = os.path.splitext(os.path.basename(instance.image.name))
+    names = {}
+    for field, size in settings.IMAGE_VARIANTS.items():
+        suffix = field.replace('image_', '')
+        variant = getattr(instance, field)
+        variant.save(f'{stem}_{suffix}{ext}',
+                     ContentFile(render_variant(image, size)), save=False)
+        names[field] = variant.name
+
+    # Если изображение успели заменить, варианты построит следующая задача.
+    updated = model.objects.filter(pk=pk, image=instance.image.name).update(
+        last_modified=timezone.now(), **names)
+    if not updated:
+        delete_variants(instance)
+        return
+    image_variants_generated.send(sender=model, pk=pk)
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from posts.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, журналами, '
+            'постами и подписками.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--journals', type=int, default=5000)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--follows', type=float, default=20,
+                            help='Среднее число подписок на пользователя.')
+        parser.add_argument('--private-share', type=float, default=0.2)
+        parser.add_argument('--pin-share', type=float, default=0.3,
+                            help='Доля приватных журналов с PIN.')
+        parser.add_argument('--image-share', type=float, default=0.05)
+        parser.add_argument('--follow-exponent', type=float, default=1.1,
+                            help='Показатель степенного распределения '
+                                 'подписчиков.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--prefix', default='seed',
+                            help='Начало имён создаваемых пользователей.')
+        parser.add_argument('--no-timelines', action='store_true',
+                            help='Не пересобирать ленты подписок.')
+
+    def handle(self, *args, **options):
+        seeder = Seeder(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            private_share=options['private_share'],
+            pin_share=options['pin_share'],
+            image_share=options['image_share'],
+            follow_exponent=options['follow_exponent'],
+            prefix=options['prefix'],
+            log=self.stdout.write,
+        )
+        stats = seeder.run(options['users'], options['journals'],
+                           options['posts'], options['follows'],
+                           timelines=not options['no_timelines'])
+        rows = sum(count for _, count, _ in stats)
+        seconds = sum(seconds for _, _, seconds in stats)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {rows} строк за {seconds:.1f} с '
+            f'({rows / seconds if seconds else 0:.0f} строк/с)'))
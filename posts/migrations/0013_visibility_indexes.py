@@ -0,0 +1,29 @@
+# Generated by Django 3.2.16 on 2026-10-17 19:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journal',
+            index=models.Index(condition=models.Q(('is_private', False)), fields=['-last_modified', 'title', 'id'], name='journal_public_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journal',
+            index=models.Index(fields=['author', '-last_modified'], name='journal_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_private', False)), fields=['-pub_date', '-id'], name='post_public_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date'], name='post_author_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations
+
+# Синхронизация posts_post_fts с posts_post на стороне SQLite: покрывает
+# и QuerySet.update(), и каскадное удаление без сигналов.
+SQLITE_TRIGGERS = {
+    'posts_post_fts_insert': (
+        'AFTER INSERT ON posts_post BEGIN '
+        'INSERT INTO posts_post_fts (rowid, text) '
+        'VALUES (new.id, new.text); END'
+    ),
+    'posts_post_fts_delete': (
+        'AFTER DELETE ON posts_post BEGIN '
+        'DELETE FROM posts_post_fts WHERE rowid = old.id; END'
+    ),
+    'posts_post_fts_update': (
+        'AFTER UPDATE OF text ON posts_post BEGIN '
+        'DELETE FROM posts_post_fts WHERE rowid = old.id; '
+        'INSERT INTO posts_post_fts (rowid, text) '
+        'VALUES (new.id, new.text); END'
+    ),
+}
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE posts_post_fts USING fts5('
+            "text, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            'INSERT INTO posts_post_fts (rowid, text) '
+            'SELECT id, text FROM posts_post'
+        )
+        for name, definition in SQLITE_TRIGGERS.items():
+            schema_editor.execute(f'CREATE TRIGGER {name} {definition}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX posts_post_text_fts_idx ON posts_post '
+            "USING GIN (to_tsvector('simple', text))"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for name in SQLITE_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        schema_editor.execute('DROP TABLE IF EXISTS posts_post_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS posts_post_text_fts_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_visibility_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.16 on 2026-10-17 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_last_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journal',
+            name='image_medium',
+            field=models.ImageField(blank=True, default=None, editable=False, null=True, upload_to='posts/variants/', verbose_name='Среднее изображение'),
+        ),
+        migrations.AddField(
+            model_name='journal',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, default=None, editable=False, null=True, upload_to='posts/variants/', verbose_name='Миниатюра'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_medium',
+            field=models.ImageField(blank=True, default=None, editable=False, null=True, upload_to='posts/variants/', verbose_name='Среднее изображение'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, default=None, editable=False, null=True, upload_to='posts/variants/', verbose_name='Миниатюра'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-17 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_image_variants'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='journal',
+            name='journal_author_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_author_idx',
+        ),
+        migrations.AddIndex(
+            model_name='exportjob',
+            index=models.Index(fields=['user', '-created'], name='exportjob_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journal',
+            index=models.Index(fields=['author', '-last_modified', 'title', 'id'], name='journal_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journal',
+            index=models.Index(fields=['is_private', 'author'], name='journal_visibility_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='post_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['journal', '-pub_date', '-id'], name='post_journal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_private', 'author'], name='post_visibility_idx'),
+        ),
+    ]
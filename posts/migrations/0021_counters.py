@@ -0,0 +1,64 @@
+# Generated by Django 3.2.16 on 2026-10-17 19:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count(queryset, field):
+    return Coalesce(
+        Subquery(queryset.order_by().values(field)
+                 .annotate(total=Count('pk')).values('total'),
+                 output_field=IntegerField()),
+        Value(0)
+    )
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Journal = apps.get_model('posts', 'Journal')
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    Profile = apps.get_model('posts', 'Profile')
+
+    Profile.objects.bulk_create(
+        [Profile(user_id=pk) for pk in User.objects.values_list('pk',
+                                                                flat=True)],
+        batch_size=1000
+    )
+    Journal.objects.update(post_count=count(
+        Post.objects.filter(journal=OuterRef('pk')), 'journal'))
+    Profile.objects.update(
+        followers_count=count(
+            Follow.objects.filter(following=OuterRef('user')), 'following'),
+        following_count=count(
+            Follow.objects.filter(user=OuterRef('user')), 'user'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0020_post_ordering_by_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journal',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество постов'),
+        ),
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('followers_count', models.PositiveIntegerField(default=0, editable=False, verbose_name='Подписчики')),
+                ('following_count', models.PositiveIntegerField(default=0, editable=False, verbose_name='Подписки')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-17 20:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_username_lower(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Profile = apps.get_model('posts', 'Profile')
+    usernames = dict(User.objects.values_list('pk', 'username'))
+    profiles = list(Profile.objects.only('id', 'user_id'))
+    for profile in profiles:
+        profile.username_lower = usernames[profile.user_id].lower()
+    Profile.objects.bulk_update(profiles, ['username_lower'],
+                                batch_size=1000)
+
+
+def use_binary_collation(apps, schema_editor):
+    # Поиск по префиксу идёт диапазоном [prefix, следующий префикс),
+    # это верно только при побайтовом сравнении строк.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE posts_profile ALTER COLUMN username_lower '
+            'TYPE varchar(150) COLLATE "C"'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0021_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='username_lower',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(fill_username_lower, migrations.RunPython.noop),
+        migrations.RunPython(use_binary_collation, migrations.RunPython.noop),
+    ]
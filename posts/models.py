@@ -1,11 +1,105 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.fields.files import FieldFile
+from django.dispatch import Signal
+from django.conf import settings
 from django.contrib.auth.hashers import make_password, check_password
+from django.core import signing
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
 
 User = get_user_model()
 
+# bulk_create не отправляет post_save, поэтому о массовой вставке постов
+# сообщает отдельный сигнал с аргументом `posts`.
+posts_bulk_created = Signal()
 
-class Journal(models.Model):
+# Варианты изображения готовятся в фоне и сохраняются через update(),
+# о готовности сообщает отдельный сигнал с аргументом `pk`.
+image_variants_generated = Signal()
+
+
+class VisibilityQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        '''
+        Записи, которые видит пользователь: все публичные и свои приватные.
+
+        Ветки условия не пересекаются, поэтому DISTINCT не нужен, а каждая
+        из них покрывается своим индексом: частичным по публичным записям
+        и составным по автору.
+        '''
+        if not user.is_authenticated:
+            return self.filter(is_private=False)
+        return self.filter(
+            Q(is_private=False) | Q(author_id=user.pk, is_private=True)
+        )
+
+
+class PostQuerySet(VisibilityQuerySet):
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False):
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, batch_size, ignore_conflicts)
+            if ignore_conflicts or not objs:
+                return objs
+            if objs[0].pk is None:
+                # SQLite в Django 3.2 не возвращает id вставленных строк.
+                # Пока транзакция открыта, SQLite держит блокировку записи,
+                # поэтому последние len(objs) id принадлежат этой вставке.
+                ids = self.model._base_manager.using(self.db).order_by(
+                    '-pk').values_list('pk', flat=True)[:len(objs)]
+                for obj, pk in zip(objs, reversed(list(ids))):
+                    obj.pk = pk
+            posts_bulk_created.send(sender=self.model, posts=objs)
+        return objs
+
+
+class TrackedFieldsMixin:
+    '''
+    Запоминает значения полей из `tracked_fields` при загрузке из БД,
+    чтобы save() видел изменения без повторного SELECT.
+    '''
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked_fields()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_tracked_fields()
+
+    def _tracked_value(self, field):
+        # FieldFile меняется на месте при сохранении файла, поэтому
+        # для файловых полей запоминается имя, а не сам объект.
+        value = self.__dict__[field]
+        return value.name if isinstance(value, FieldFile) else value
+
+    def _remember_tracked_fields(self):
+        self._original_values = {
+            field: self._tracked_value(field)
+            for field in self.tracked_fields if field in self.__dict__
+        }
+
+    def original_value(self, field):
+        '''Значение поля при загрузке из БД или None, если неизвестно.'''
+        return getattr(self, '_original_values', {}).get(field)
+
+    def has_changed(self, field):
+        '''
+        Изменилось ли поле с момента загрузки. Если исходное значение
+        неизвестно (объект создан не из БД или поле отложено), считается,
+        что изменилось.
+        '''
+        original = getattr(self, '_original_values', {})
+        if field not in original or field not in self.__dict__:
+            return True
+        return original[field] != self._tracked_value(field)
+
+
+class Journal(TrackedFieldsMixin, models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True,)
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
@@ -14,11 +108,19 @@ class Journal(models.Model):
         User, on_delete=models.CASCADE, related_name='journals')
     image = models.ImageField(
         upload_to='posts/', null=True, blank=True, default=None)
+    image_thumbnail = models.ImageField(
+        'Миниатюра', upload_to='posts/variants/', null=True, blank=True,
+        default=None, editable=False)
+    image_medium = models.ImageField(
+        'Среднее изображение', upload_to='posts/variants/', null=True,
+        blank=True, default=None, editable=False)
     is_private = models.BooleanField(
         default=False,
         verbose_name="Приватный пост",
         help_text="Если отмечено, журнал доступен только автору"
     )
+    post_count = models.PositiveIntegerField(
+        'Количество постов', default=0, editable=False)
     pin_code = models.CharField(
         max_length=128,
         null=True,
@@ -28,44 +130,113 @@ class Journal(models.Model):
         help_text="Необязательный код для доступа к посту (4-6 цифр)"
     )
 
+    objects = VisibilityQuerySet.as_manager()
+
+    tracked_fields = ('is_private', 'image')
+    # Счётчики меняются только через update(F(...)) и не должны
+    # перезаписываться значением из устаревшего экземпляра.
+    counter_fields = ('post_count',)
+
     def save(self, *args, **kwargs):
-        if self.pk:
-            previous = Journal.objects.get(pk=self.pk)
-            if previous.is_private != self.is_private:
-                if not self.is_private:
-                    self.posts.update(is_private=False)
-                else:
-                    self.posts.update(is_private=True)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            update_fields = kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.counter_fields
+            ]
+        if (not self._state.adding and self.has_changed('is_private')
+                and (update_fields is None or 'is_private' in update_fields)):
+            self.posts.update(is_private=self.is_private,
+                              last_modified=timezone.now())
         if not self.is_private:
             self.pin_code = None
 
         super(Journal, self).save(*args, **kwargs)
+        self._remember_tracked_fields()
 
     def set_pin(self, raw_pin):
         if raw_pin:
-            self.pin_code = make_password(raw_pin)
+            self.pin_code = make_password(
+                raw_pin, hasher=settings.JOURNAL_PIN_HASHER)
         else:
             self.pin_code = None
 
     def check_pin(self, raw_pin):
         if not self.pin_code:
             return True
-        return check_password(raw_pin, self.pin_code)
+
+        def setter(raw_pin):
+            # PIN, захешированный другим алгоритмом, перехешируется
+            # настроенным при первой успешной проверке.
+            self.set_pin(raw_pin)
+            Journal.objects.filter(pk=self.pk).update(pin_code=self.pin_code)
+
+        return check_password(raw_pin, self.pin_code, setter,
+                              preferred=settings.JOURNAL_PIN_HASHER)
+
+    def _pin_fingerprint(self):
+        return salted_hmac('journal-pin', self.pin_code or '').hexdigest()
+
+    def make_pin_token(self, client):
+        '''
+        Подписанный токен успешной проверки PIN для пары журнал/клиент.
+        Становится недействительным при смене PIN.
+        '''
+        return signing.dumps(
+            {'journal': self.pk, 'client': str(client),
+             'pin': self._pin_fingerprint()},
+            salt='journal-pin-token'
+        )
+
+    def check_pin_token(self, token, client):
+        try:
+            data = signing.loads(
+                token,
+                salt='journal-pin-token',
+                max_age=settings.JOURNAL_PIN_TOKEN_MAX_AGE
+            )
+        except signing.BadSignature:
+            return False
+        return data == {'journal': self.pk, 'client': str(client),
+                        'pin': self._pin_fingerprint()}
 
     class Meta:
         ordering = ['-last_modified', 'title']
+        indexes = [
+            models.Index(fields=['-last_modified', 'title', 'id'],
+                         name='journal_ordering_idx'),
+            models.Index(fields=['-last_modified', 'title', 'id'],
+                         name='journal_public_idx',
+                         condition=Q(is_private=False)),
+            models.Index(fields=['author', '-last_modified', 'title', 'id'],
+                         name='journal_author_idx'),
+            # Узкий покрывающий индекс для COUNT(*) списка с limit/offset:
+            # условие видимости проверяется без чтения строк таблицы.
+            models.Index(fields=['is_private', 'author'],
+                         name='journal_visibility_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 
-class Post(models.Model):
+class Post(TrackedFieldsMixin, models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    last_modified = models.DateTimeField('Дата обновления', auto_now=True)
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='posts')
     image = models.ImageField(
         upload_to='posts/', null=True, blank=True, default=None)
+    image_thumbnail = models.ImageField(
+        'Миниатюра', upload_to='posts/variants/', null=True, blank=True,
+        default=None, editable=False)
+    image_medium = models.ImageField(
+        'Среднее изображение', upload_to='posts/variants/', null=True,
+        blank=True, default=None, editable=False)
     is_private = models.BooleanField(
         default=False,
         verbose_name="Приватный пост",
@@ -74,14 +245,48 @@ class Post(models.Model):
     journal = models.ForeignKey(Journal, on_delete=models.CASCADE,
                                 related_name='posts')
 
+    objects = PostQuerySet.as_manager()
+
+    tracked_fields = ('is_private', 'journal_id', 'text', 'image')
+
     def save(self, *args, **kwargs):
-        if self.journal.is_private:
-            self.is_private = True
+        # Посты приватного журнала всегда приватны, а при смене
+        # приватности журнала Journal.save обновляет его посты. Поэтому
+        # журнал нужно проверять, только если пост новый, переносится
+        # в другой журнал или становится публичным.
+        if (self._state.adding or self.has_changed('journal_id')
+                or (not self.is_private and self.has_changed('is_private'))):
+            if self.journal.is_private:
+                self.is_private = True
 
-        super(Post, self).save(*args, **kwargs)
+        if self._state.adding or self.has_changed('journal_id'):
+            # Счётчик постов журнала обновляется в post_save в той же
+            # транзакции.
+            with transaction.atomic(using=kwargs.get('using'),
+                                    savepoint=False):
+                super(Post, self).save(*args, **kwargs)
+        else:
+            super(Post, self).save(*args, **kwargs)
+        self._remember_tracked_fields()
 
     class Meta:
-        ordering = ['-pub_date', 'text']
+        # id, а не text: сравнение длинных текстов при равных pub_date
+        # дорого, и текст не помещается в компактный индекс.
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='post_ordering_idx'),
+            models.Index(fields=['-pub_date', '-id'],
+                         name='post_public_idx',
+                         condition=Q(is_private=False)),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_idx'),
+            models.Index(fields=['journal', '-pub_date', '-id'],
+                         name='post_journal_idx'),
+            # Для COUNT(*) списка, как journal_visibility_idx.
+            models.Index(fields=['is_private', 'author'],
+                         name='post_visibility_idx'),
+        ]
 
     def __str__(self):
         return self.text
@@ -96,5 +301,111 @@ class Follow(models.Model):
     class Meta:
         unique_together = ('user', 'following')
 
+    def save(self, *args, **kwargs):
+        # Счётчики подписок обновляются в post_save в той же транзакции.
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f'{self.user.username} follows {self.following.username}'
+
+
+class Profile(models.Model):
+    '''
+    Денормализованные счётчики пользователя. Создаётся вместе
+    с пользователем, счётчики обновляются сигналами Follow.
+    '''
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name='profile')
+    followers_count = models.PositiveIntegerField(
+        'Подписчики', default=0, editable=False)
+    following_count = models.PositiveIntegerField(
+        'Подписки', default=0, editable=False)
+    # Имя пользователя в нижнем регистре для поиска по префиксу:
+    # LOWER() в SQLite не знает не-ASCII букв, поэтому значение
+    # нормализуется в Python и хранится с обычным индексом.
+    username_lower = models.CharField(
+        max_length=150, db_index=True, default='', editable=False)
+
+    def __str__(self):
+        return f'Профиль {self.user_id}'
+
+
+class ExportJob(models.Model):
+    JSONL = 'jsonl'
+    CSV = 'csv'
+    MARKDOWN = 'md'
+    ZIP = 'zip'
+    FORMAT_CHOICES = (
+        (JSONL, 'JSON Lines'),
+        (CSV, 'CSV'),
+        (MARKDOWN, 'Markdown'),
+        (ZIP, 'ZIP с изображениями'),
+    )
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='export_jobs')
+    journal = models.ForeignKey(
+        Journal,
+        on_delete=models.CASCADE,
+        related_name='export_jobs',
+        null=True,
+        blank=True,
+        help_text="Если не указан, выгружается весь аккаунт"
+    )
+    export_format = models.CharField(max_length=8, choices=FORMAT_CHOICES)
+    status = models.CharField(
+        max_length=8, choices=STATUS_CHOICES, default=PENDING)
+    file = models.FileField(upload_to='exports/', null=True, blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    finished = models.DateTimeField('Дата завершения', null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['user', '-created'],
+                         name='exportjob_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user.username}: {self.export_format} ({self.status})'
+
+
+class TimelineEntry(models.Model):
+    '''
+    Запись ленты подписчика: публичный пост автора, на которого он
+    подписан. Заполняется при публикации поста (fan-out on write),
+    поэтому лента читается одним диапазоном индекса по (user, pub_date).
+    '''
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='timeline')
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+')
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ['-pub_date', '-id']
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', '-pub_date', '-id'],
+                         name='timeline_user_idx'),
+            models.Index(fields=['user', 'author'],
+                         name='timeline_user_author_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.post_id}'
@@ -0,0 +1,139 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+class BaseSearchBackend:
+    '''
+    Интерфейс полнотекстового поиска по постам: `search` фильтрует
+    queryset и сортирует его по релевантности.
+    '''
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    '''Запасной вариант без индекса: LIKE по каждому слову.'''
+
+    def search(self, queryset, query):
+        for token in tokenize(query):
+            queryset = queryset.filter(text__icontains=token)
+        return queryset
+
+
+class SQLiteFTS5SearchBackend(BaseSearchBackend):
+    '''
+    Виртуальная таблица FTS5, rowid которой совпадает с id поста.
+    Таблица и триггеры синхронизации создаются миграцией
+    0014_post_search_index.
+    '''
+    table = 'posts_post_fts'
+
+    # Те же триггеры, что в миграции 0014.
+    triggers = {
+        'insert': (
+            'AFTER INSERT ON posts_post BEGIN '
+            'INSERT INTO posts_post_fts (rowid, text) '
+            'VALUES (new.id, new.text); END'
+        ),
+        'delete': (
+            'AFTER DELETE ON posts_post BEGIN '
+            'DELETE FROM posts_post_fts WHERE rowid = old.id; END'
+        ),
+        'update': (
+            'AFTER UPDATE OF text ON posts_post BEGIN '
+            'DELETE FROM posts_post_fts WHERE rowid = old.id; '
+            'INSERT INTO posts_post_fts (rowid, text) '
+            'VALUES (new.id, new.text); END'
+        ),
+    }
+
+    @classmethod
+    def install_triggers(cls, connection):
+        '''
+        Триггеры держат таблицу в согласии с posts_post, в том числе при
+        QuerySet.update() и каскадном удалении. SQLite удаляет их вместе
+        с таблицей, когда Django пересоздаёт posts_post в миграциях,
+        поэтому после migrate они ставятся снова.
+        '''
+        if cls.table not in connection.introspection.table_names():
+            return
+        with connection.cursor() as cursor:
+            for name, definition in cls.triggers.items():
+                cursor.execute(f'CREATE TRIGGER IF NOT EXISTS '
+                               f'{cls.table}_{name} {definition}')
+
+    def build_match(self, tokens):
+        # Каждое слово ищется как префикс: "журн"* найдёт "журнал".
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        match = self.build_match(tokens)
+        post_table = queryset.model._meta.db_table
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            [match]
+        )).annotate(search_rank=RawSQL(
+            f'SELECT bm25({self.table}) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s '
+            f'AND rowid = "{post_table}"."id"',
+            [match]
+        )).order_by('search_rank', *queryset.model._meta.ordering)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    '''
+    Поиск по tsvector. Индекс GIN по выражению
+    to_tsvector('simple', text) создаётся миграцией и обновляется
+    самой базой.
+
+    Вектор строится тем же выражением, что и индекс: SearchVector
+    добавляет COALESCE, и с ним индекс не используется.
+    '''
+    config = 'simple'
+
+    def get_vector(self):
+        from django.contrib.postgres.search import SearchVectorField
+        from django.db.models import F, Func, Value
+
+        return Func(Value(self.config), F('text'), function='to_tsvector',
+                    output_field=SearchVectorField())
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        vector = self.get_vector()
+        search_query = SearchQuery(
+            ' & '.join(f'{token}:*' for token in tokens),
+            config=self.config,
+            search_type='raw'
+        )
+        return queryset.annotate(
+            search_vector=vector,
+            search_rank=SearchRank(vector, search_query)
+        ).filter(search_vector=search_query).order_by(
+            '-search_rank', *queryset.model._meta.ordering)
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    return import_string(settings.POSTS_SEARCH_BACKEND)()
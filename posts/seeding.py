@@ -0,0 +1,221 @@
+'''
+Синтетические данные для нагрузочных тестов и оценки объёмов:
+пользователи, журналы (приватные, с PIN, с обложками), посты
+и подписки со степенным распределением подписчиков.
+'''
+import io
+import random
+import time
+from contextlib import contextmanager
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import QuerySet
+from PIL import Image
+
+from . import counters, timeline
+from .images import render_variant
+from .models import Follow, Journal, Post, Profile
+
+User = get_user_model()
+
+PASSWORD = 'seed-password'
+PIN = '1234'
+WORDS = (
+    'день', 'утро', 'вечер', 'работа', 'дом', 'книга', 'прогулка', 'город',
+    'море', 'лес', 'друг', 'семья', 'кофе', 'дождь', 'солнце', 'музыка',
+    'фильм', 'мысль', 'план', 'поездка', 'спорт', 'обед', 'письмо', 'сон',
+)
+IMAGE_COLORS = ('#d33', '#3a3', '#36c', '#fc3')
+
+
+class Seeder:
+    '''
+    Создаёт данные пачками через bulk_create, каждая пачка - в своей
+    транзакции. При одинаковом `seed` данные совпадают. После вызова
+    run() в `stats` лежат (этап, строк, секунд).
+    '''
+
+    def __init__(self, seed=0, batch_size=10000, private_share=0.2,
+                 pin_share=0.3, image_share=0.05, follow_exponent=1.1,
+                 prefix='seed', log=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.private_share = private_share
+        self.pin_share = pin_share
+        self.image_share = image_share
+        self.follow_exponent = follow_exponent
+        self.prefix = prefix
+        self.log = log or (lambda message: None)
+        self.stats = []
+
+    def run(self, users, journals, posts, follows, timelines=True):
+        '''`follows` - среднее число подписок на пользователя.'''
+        # Хеши считаются один раз: PBKDF2 на каждую строку занял бы часы.
+        self.password = make_password(PASSWORD)
+        self.pin_code = make_password(PIN, hasher=settings.JOURNAL_PIN_HASHER)
+        self.images = self.create_images() if self.image_share else []
+
+        user_ids = self.create_users(users)
+        journal_rows = self.create_journals(user_ids, journals)
+        self.create_posts(journal_rows, posts)
+        self.create_follows(user_ids, follows)
+        with self.stage('Счётчики') as stage:
+            counters.rebuild()
+            stage['rows'] = len(user_ids)
+        if timelines:
+            with self.stage('Ленты') as stage:
+                with transaction.atomic():
+                    timeline.rebuild()
+                stage['rows'] = Follow.objects.count()
+        return self.stats
+
+    @contextmanager
+    def stage(self, name):
+        stage = {'rows': 0}
+        started = time.perf_counter()
+        yield stage
+        seconds = time.perf_counter() - started
+        self.stats.append((name, stage['rows'], seconds))
+        rate = stage['rows'] / seconds if seconds else 0
+        self.log(f'{name}: {stage["rows"]} за {seconds:.1f} с '
+                 f'({rate:.0f} строк/с)')
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield range(start, min(start + self.batch_size, total))
+
+    def choose_image(self):
+        if self.images and self.rng.random() < self.image_share:
+            return self.rng.choice(self.images)
+        return {}
+
+    def create_images(self):
+        '''
+        Несколько общих изображений с готовыми вариантами: фоновая
+        генерация вариантов для них не запускается.
+        '''
+        images = []
+        for number, color in enumerate(IMAGE_COLORS):
+            image = Image.new('RGB', (1200, 900), color)
+            image.format = 'PNG'
+            names = {}
+            for field, size in (('image', None),
+                                *settings.IMAGE_VARIANTS.items()):
+                name = f'seed/{number}_{field}.png'
+                if not default_storage.exists(name):
+                    if size is None:
+                        buffer = io.BytesIO()
+                        image.save(buffer, format='PNG')
+                        content = buffer.getvalue()
+                    else:
+                        content = render_variant(image, size)
+                    name = default_storage.save(name, ContentFile(content))
+                names[field] = name
+            images.append(names)
+        return images
+
+    def create_users(self, total):
+        with self.stage('Пользователи') as stage:
+            last_id = User.objects.order_by('-pk').values_list(
+                'pk', flat=True).first() or 0
+            for batch in self.batches(total):
+                with transaction.atomic():
+                    User.objects.bulk_create(
+                        [User(username=f'{self.prefix}{number}',
+                              password=self.password) for number in batch])
+                    created = User.objects.filter(
+                        username__in=[f'{self.prefix}{number}'
+                                      for number in batch]
+                    ).values_list('pk', 'username')
+                    Profile.objects.bulk_create(
+                        [Profile(user_id=pk, username_lower=username.lower())
+                         for pk, username in created])
+                stage['rows'] += len(batch)
+            return list(User.objects.filter(pk__gt=last_id).order_by(
+                'pk').values_list('pk', flat=True))
+
+    def create_journals(self, user_ids, total):
+        with self.stage('Журналы') as stage:
+            last_id = Journal.objects.order_by('-pk').values_list(
+                'pk', flat=True).first() or 0
+            for batch in self.batches(total):
+                journals = []
+                for number in batch:
+                    is_private = self.rng.random() < self.private_share
+                    has_pin = is_private and self.rng.random() < self.pin_share
+                    journals.append(Journal(
+                        title=f'Журнал {number}',
+                        description=self.text(3, 15),
+                        author_id=self.rng.choice(user_ids),
+                        is_private=is_private,
+                        pin_code=self.pin_code if has_pin else None,
+                        **self.choose_image()
+                    ))
+                with transaction.atomic():
+                    Journal.objects.bulk_create(journals)
+                stage['rows'] += len(batch)
+            return list(Journal.objects.filter(pk__gt=last_id).values_list(
+                'pk', 'author_id', 'is_private'))
+
+    def create_posts(self, journal_rows, total):
+        with self.stage('Посты') as stage:
+            for batch in self.batches(total):
+                posts = []
+                for _ in batch:
+                    journal_id, author_id, is_private = self.rng.choice(
+                        journal_rows)
+                    posts.append(Post(
+                        text=self.text(5, 60), author_id=author_id,
+                        journal_id=journal_id,
+                        is_private=(is_private
+                                    or self.rng.random() < self.private_share),
+                        **self.choose_image()
+                    ))
+                # Без posts_bulk_created: счётчики и ленты run() всё равно
+                # строит заново, а варианты изображений уже готовы.
+                with transaction.atomic():
+                    QuerySet(Post).bulk_create(posts)
+                stage['rows'] += len(batch)
+
+    def create_follows(self, user_ids, mean):
+        '''
+        Число подписок пользователя - экспоненциальное со средним `mean`,
+        на кого подписаться - по закону Ципфа от случайного рейтинга
+        популярности, поэтому у немногих авторов много подписчиков.
+        '''
+        if len(user_ids) < 2 or not mean:
+            return
+        with self.stage('Подписки') as stage:
+            popular = list(user_ids)
+            self.rng.shuffle(popular)
+            weights = list(accumulate(
+                1 / (rank + 1) ** self.follow_exponent
+                for rank in range(len(popular))))
+            follows = []
+            for user_id in user_ids:
+                count = min(int(self.rng.expovariate(1 / mean)),
+                            len(user_ids) - 1)
+                targets = set(self.rng.choices(
+                    popular, cum_weights=weights, k=count))
+                targets.discard(user_id)
+                follows.extend(Follow(user_id=user_id, following_id=target)
+                               for target in targets)
+                if len(follows) >= self.batch_size:
+                    stage['rows'] += self.save_follows(follows)
+                    follows = []
+            stage['rows'] += self.save_follows(follows)
+
+    def save_follows(self, follows):
+        with transaction.atomic():
+            Follow.objects.bulk_create(follows, ignore_conflicts=True)
+        return len(follows)
+
+    def text(self, minimum, maximum):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(
+            self.rng.randint(minimum, maximum))).capitalize()
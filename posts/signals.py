@@ -0,0 +1,158 @@
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from . import counters, timeline
+from .images import generate_image_variants
+from .models import (ExportJob, Follow, Journal, Post, Profile,
+                     posts_bulk_created)
+from .search import SQLiteFTS5SearchBackend
+from .tasks import run_in_background
+
+User = get_user_model()
+
+
+@receiver(post_migrate)
+def install_search_triggers(sender, using, **kwargs):
+    if sender.name == 'posts' and connections[using].vendor == 'sqlite':
+        SQLiteFTS5SearchBackend.install_triggers(connections[using])
+
+
+@receiver(post_delete, sender=ExportJob)
+def delete_export_file(sender, instance, **kwargs):
+    if instance.file:
+        instance.file.delete(save=False)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created or (instance.has_changed('is_private')
+                   and not instance.is_private):
+        timeline.schedule_fan_out([instance])
+
+
+@receiver(posts_bulk_created, sender=Post)
+def fan_out_posts(sender, posts, **kwargs):
+    timeline.schedule_fan_out(posts)
+
+
+@receiver(post_save, sender=Journal)
+def fan_out_published_journal(sender, instance, created, **kwargs):
+    # Посты журнала, ставшего публичным, обновляются через update()
+    # без сигналов, поэтому раскладываются здесь.
+    if not created and instance.has_changed('is_private') \
+            and not instance.is_private:
+        timeline.schedule_fan_out(list(
+            instance.posts.only('id', 'author', 'is_private')))
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        timeline.backfill(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def clear_timeline(sender, instance, **kwargs):
+    # Ленты удаляемого пользователя и записи с его постами удалятся
+    # каскадом.
+    if not is_user_deleted(instance):
+        timeline.remove(instance.user_id, instance.following_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Journal)
+def schedule_image_variants(sender, instance, created, **kwargs):
+    if created and not instance.image:
+        return
+    if instance.has_changed('image'):
+        run_in_background(generate_image_variants,
+                          sender._meta.label, instance.pk)
+
+
+@receiver(posts_bulk_created, sender=Post)
+def schedule_bulk_image_variants(sender, posts, **kwargs):
+    for post in posts:
+        if post.image:
+            run_in_background(generate_image_variants,
+                              sender._meta.label, post.pk)
+
+
+@receiver(post_save, sender=User)
+def sync_profile(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    username_lower = instance.username.lower()
+    if created:
+        Profile.objects.create(user=instance, username_lower=username_lower)
+    else:
+        Profile.objects.filter(user=instance).exclude(
+            username_lower=username_lower
+        ).update(username_lower=username_lower)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    if created:
+        counters.change_post_counts({instance.journal_id: 1})
+    elif instance.has_changed('journal_id'):
+        previous = instance.original_value('journal_id')
+        if previous is not None:
+            counters.change_post_counts(
+                {previous: -1, instance.journal_id: 1})
+
+
+@receiver(posts_bulk_created, sender=Post)
+def count_created_posts(sender, posts, **kwargs):
+    counters.change_post_counts(counters.count_posts(posts))
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    if instance.journal_id not in counters.being_deleted(Journal):
+        counters.change_post_counts({instance.journal_id: -1})
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        counters.change_follow_counts(
+            instance.user_id, instance.following_id, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    if not is_user_deleted(instance):
+        counters.change_follow_counts(
+            instance.user_id, instance.following_id, -1)
+
+
+def is_user_deleted(follow):
+    deleting = counters.being_deleted(User)
+    return follow.user_id in deleting or follow.following_id in deleting
+
+
+# Каскадное удаление журнала или пользователя не обновляет счётчики на
+# каждый пост и подписку: посты удаляются вместе с журналом, а счётчики
+# подписок пользователя обновляются заранее, одним запросом на сторону.
+@receiver(pre_delete, sender=Journal)
+def mark_deleted_journal(sender, instance, **kwargs):
+    counters.being_deleted(Journal).add(instance.pk)
+
+
+@receiver(post_delete, sender=Journal)
+def unmark_deleted_journal(sender, instance, **kwargs):
+    counters.being_deleted(Journal).discard(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def mark_deleted_user(sender, instance, **kwargs):
+    counters.uncount_user_follows(instance.pk)
+    counters.being_deleted(User).add(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def unmark_deleted_user(sender, instance, **kwargs):
+    counters.being_deleted(User).discard(instance.pk)
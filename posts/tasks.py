@@ -0,0 +1,48 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BACKGROUND_TASKS_WORKERS,
+            thread_name_prefix='journals-task'
+        )
+    return _executor
+
+
+def _run(func, args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась ошибкой',
+                         func.__name__)
+
+
+def _run_in_worker(func, args):
+    try:
+        _run(func, args)
+    finally:
+        close_old_connections()
+
+
+def run_in_background(func, *args):
+    '''
+    Выполняет func(*args) в пуле потоков после коммита текущей
+    транзакции, чтобы задача увидела созданные в запросе строки.
+    При BACKGROUND_TASKS_EAGER = True задача выполняется сразу
+    в том же потоке (используется в тестах).
+    '''
+    if settings.BACKGROUND_TASKS_EAGER:
+        transaction.on_commit(lambda: _run(func, args))
+        return
+    transaction.on_commit(
+        lambda: get_executor().submit(_run_in_worker, func, args))
@@ -0,0 +1,69 @@
+from django.conf import settings
+
+from .models import Follow, Post, TimelineEntry
+from .tasks import run_in_background
+
+
+def _entries(post, follower_ids):
+    return [
+        TimelineEntry(user_id=follower_id, post_id=post.pk,
+                      author_id=post.author_id, pub_date=post.pub_date)
+        for follower_id in follower_ids
+    ]
+
+
+def fan_out(post_ids):
+    '''Раскладывает публичные посты по лентам подписчиков авторов.'''
+    posts = Post.objects.filter(pk__in=post_ids, is_private=False).only(
+        'id', 'author', 'pub_date')
+    followers = {}
+    for post in posts:
+        if post.author_id not in followers:
+            followers[post.author_id] = list(
+                Follow.objects.filter(following_id=post.author_id)
+                .values_list('user_id', flat=True))
+        TimelineEntry.objects.bulk_create(
+            _entries(post, followers[post.author_id]),
+            batch_size=settings.FEED_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+
+
+def schedule_fan_out(posts):
+    '''
+    Небольшие раскладки выполняются сразу, раскладка постов авторов
+    с большим числом подписчиков уходит в фоновую задачу.
+    '''
+    post_ids = [post.pk for post in posts if not post.is_private]
+    if not post_ids:
+        return
+    author_ids = {post.author_id for post in posts}
+    followers = Follow.objects.filter(following_id__in=author_ids).count()
+    if followers <= settings.FEED_FANOUT_SYNC_LIMIT:
+        fan_out(post_ids)
+    else:
+        run_in_background(fan_out, post_ids)
+
+
+def backfill(user_id, author_id):
+    '''Добавляет в ленту последние публичные посты нового автора.'''
+    posts = Post.objects.filter(author_id=author_id, is_private=False).only(
+        'id', 'author', 'pub_date'
+    ).order_by('-pub_date', '-id')[:settings.FEED_BACKFILL_SIZE]
+    TimelineEntry.objects.bulk_create(
+        [entry for post in posts for entry in _entries(post, [user_id])],
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def remove(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild():
+    '''Пересобирает все ленты по текущим подпискам.'''
+    TimelineEntry.objects.all().delete()
+    for user_id, author_id in Follow.objects.values_list(
+            'user_id', 'following_id').iterator():
+        backfill(user_id, author_id)
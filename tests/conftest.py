@@ -11,4 +11,6 @@ PROJECT_DIR_NAME = 'journals'
 pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
+    'tests.fixtures.fixture_cache',
+    'tests.fixtures.fixture_media',
 ]
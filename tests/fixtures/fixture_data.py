@@ -45,3 +45,20 @@ def follow_4(another_user, user):
 @pytest.fixture
 def follow_5(user_2, user):
     return Follow.objects.create(user=user, following=user_2)
+
+
+@pytest.fixture
+def journal(user):
+    return Journal.objects.create(title='Журнал 1', author=user)
+
+
+@pytest.fixture
+def private_journal(user):
+    return Journal.objects.create(
+        title='Приватный журнал', author=user, is_private=True
+    )
+
+
+@pytest.fixture
+def another_journal(another_user):
+    return Journal.objects.create(title='Чужой журнал', author=another_user)
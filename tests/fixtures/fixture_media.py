@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture
+def eager_tasks(settings, tmp_path):
+    '''Фоновые задачи выполняются сразу, файлы пишутся во временный каталог.'''
+    settings.BACKGROUND_TASKS_EAGER = True
+    settings.MEDIA_ROOT = str(tmp_path)
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReadPath:
+
+    @pytest.fixture
+    def posts(self, user, journal, private_journal, another_user,
+              another_journal):
+        return [
+            Post.objects.create(text='Публичный', author=user,
+                                journal=journal),
+            Post.objects.create(text='Приватный', author=user,
+                                journal=private_journal),
+            Post.objects.create(text='Чужой', author=another_user,
+                                journal=another_journal),
+        ]
+
+    @pytest.mark.parametrize('path', [
+        'posts/', 'posts/?limit=2', 'journals/',
+        'users/search/?search=Test',
+    ])
+    def test_same_as_sync(self, user_client, posts, path):
+        sync = user_client.get(f'/api/v1/{path}')
+        async_ = user_client.get(f'/api/async/v1/{path}')
+        assert async_.status_code == sync.status_code == HTTPStatus.OK
+        sync_data, async_data = sync.json(), async_.json()
+        if isinstance(sync_data, dict):
+            sync_data = sync_data['results']
+            async_data = async_data['results']
+        assert async_data == sync_data, (
+            f'Проверьте, что `/api/async/v1/{path}` возвращает те же '
+            f'данные, что и `/api/v1/{path}`.'
+        )
+
+    def test_detail(self, user_client, client, posts):
+        url = f'/api/async/v1/posts/{posts[1].id}/'
+        assert user_client.get(url).json()['text'] == 'Приватный'
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что асинхронный эндпоинт учитывает видимость '
+            'приватных постов.'
+        )
+        journal_url = f'/api/async/v1/journals/{posts[0].journal_id}/'
+        assert client.get(journal_url).status_code == HTTPStatus.OK
+
+    def test_feed(self, user_client, client, posts, follow_1):
+        response = user_client.get('/api/async/v1/feed/')
+        assert [item['id'] for item in response.json()] == [posts[2].id]
+        assert client.get('/api/async/v1/feed/').status_code == (
+            HTTPStatus.UNAUTHORIZED)
+
+    def test_read_only(self, user_client, journal):
+        response = user_client.post(
+            '/api/async/v1/posts/',
+            data={'text': 'Новый', 'journal': journal.id}, format='json'
+        )
+        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED, (
+            'Проверьте, что асинхронные эндпоинты доступны только для '
+            'чтения.'
+        )
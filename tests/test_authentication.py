@@ -0,0 +1,140 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+from api.authentication import UserCache, get_user_cache
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCachedJWTAuthentication:
+
+    url = '/api/v1/follow/'
+
+    def test_cached_user_no_queries(self, user_client,
+                                    django_assert_num_queries):
+        user_client.get(self.url)
+        with django_assert_num_queries(1):
+            response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторный запрос с тем же токеном берёт '
+            'пользователя из кеша и не обращается к таблице пользователей.'
+        )
+
+    def test_deactivated_user_rejected(self, user_client, user):
+        user_client.get(self.url)
+        user.is_active = False
+        user.save()
+
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после деактивации пользователь удаляется из '
+            'кеша аутентификации.'
+        )
+
+    def test_deleted_user_evicted(self, user_client, user):
+        user_client.get(self.url)
+        assert get_user_cache().get(user.pk) is not None
+        user.delete()
+        assert get_user_cache().get(user.pk) is None
+
+
+class TestUserCache:
+
+    def test_lru_bounded(self):
+        cache = UserCache(max_size=2, ttl=60)
+        cache.set(1, 'first')
+        cache.set(2, 'second')
+        cache.get(1)
+        cache.set(3, 'third')
+
+        assert cache.get(2) is None, (
+            'Проверьте, что при переполнении вытесняется давно не '
+            'использованный пользователь.'
+        )
+        assert cache.get(1) == 'first'
+        assert cache.get(3) == 'third'
+
+    def test_delete_seen_by_other_processes(self):
+        first = UserCache(max_size=10, ttl=60, cache_alias='default')
+        second = UserCache(max_size=10, ttl=60, cache_alias='default')
+        first.set(1, 'user')
+        assert second.get(1) == 'user'
+        first.delete(1)
+        assert second.get(1) is None, (
+            'Проверьте, что удаление из кеша одного процесса сбрасывает '
+            'локальные копии в других процессах.'
+        )
+        second.set(1, 'updated')
+        assert first.get(1) == 'updated'
+
+    def test_ttl(self, monkeypatch):
+        cache = UserCache(max_size=10, ttl=60)
+        cache.set(1, 'user')
+        now = time.monotonic()
+        monkeypatch.setattr('api.authentication.time.monotonic',
+                            lambda: now + 61)
+        assert cache.get(1) is None, (
+            'Проверьте, что записи кеша истекают через TTL.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTokenUserMode:
+
+    url_create = '/api/v1/jwt/create/'
+    post_list_url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def claims_client(self, client, user):
+        from rest_framework.test import APIClient
+
+        response = client.post(self.url_create, data={
+            'username': user.username, 'password': '1234567'})
+        assert response.status_code == HTTPStatus.OK
+        api_client = APIClient()
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["access"]}')
+        return api_client
+
+    def test_token_has_claims(self, client, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        response = client.post(self.url_create, data={
+            'username': user.username, 'password': '1234567'})
+        token = AccessToken(response.json()['access'])
+        assert token['username'] == user.username
+        assert token['is_active'] is True
+
+    def test_list_without_user_query(self, claims_client, user,
+                                     private_journal,
+                                     django_assert_num_queries):
+        get_user_cache().clear()
+        # Только выборка, без запроса пользователя.
+        with django_assert_num_queries(1):
+            response = claims_client.get(self.post_list_url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что список постов доступен с пользователем из '
+            'клеймов токена без загрузки User.'
+        )
+
+    def test_list_shows_own_private(self, claims_client, user,
+                                    private_journal):
+        from posts.models import Post
+
+        post = Post.objects.create(text='Секрет', author=user,
+                                   journal=private_journal)
+        response = claims_client.get(self.post_list_url)
+        assert [item['id'] for item in response.json()] == [post.id]
+
+    def test_write_loads_full_user(self, claims_client, user, journal):
+        response = claims_client.post(
+            self.post_list_url,
+            data={'text': 'Пост', 'journal': journal.id},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что действия записи получают полноценного '
+            'пользователя.'
+        )
+        assert response.json()['author'] == user.username
@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostBulkCreate:
+
+    url = '/api/v1/posts/bulk/'
+
+    def test_bulk_create(self, user_client, user, journal, private_journal):
+        data = [
+            {'text': 'Первая', 'journal': journal.id},
+            {'text': 'Вторая', 'journal': private_journal.id},
+            {'text': 'Третья', 'journal': journal.id, 'is_private': True},
+        ]
+        response = user_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{self.url}` со списком постов '
+            'возвращает ответ со статусом 201.'
+        )
+
+        created = response.json()
+        assert [item['text'] for item in created] == [
+            item['text'] for item in data]
+        db_posts = {post.id: post for post in Post.objects.all()}
+        assert set(db_posts) == {item['id'] for item in created}, (
+            'Проверьте, что в ответе возвращаются id созданных постов.'
+        )
+        assert all(post.author == user for post in db_posts.values())
+        assert db_posts[created[1]['id']].is_private, (
+            'Проверьте, что посты приватного журнала создаются приватными.'
+        )
+
+    def test_bulk_create_is_searchable(self, user_client, journal):
+        user_client.post(
+            self.url, data=[{'text': 'импортированная запись',
+                             'journal': journal.id}],
+            format='json'
+        )
+        response = user_client.get('/api/v1/posts/',
+                                   {'search': 'импорт'})
+        assert len(response.json()) == 1, (
+            'Проверьте, что посты, созданные массово, попадают в '
+            'поисковый индекс.'
+        )
+
+    def test_bulk_create_item_errors(self, user_client, journal):
+        data = [
+            {'text': 'Нормальный', 'journal': journal.id},
+            {'journal': journal.id},
+            {'text': 'Без журнала', 'journal': 100500},
+        ]
+        response = user_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()['errors']
+        assert [error['index'] for error in errors] == [1, 2], (
+            'Проверьте, что ошибки валидации возвращаются с индексами '
+            'элементов.'
+        )
+        assert not Post.objects.exists(), (
+            'Проверьте, что при ошибке ни один пост не создаётся.'
+        )
+
+    def test_bulk_create_foreign_journal(self, user_client, journal,
+                                         another_journal):
+        data = [
+            {'text': 'Свой', 'journal': journal.id},
+            {'text': 'Чужой', 'journal': another_journal.id},
+        ]
+        response = user_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert response.json()['errors'][0]['index'] == 1
+        assert not Post.objects.exists()
+
+    def test_bulk_create_query_count(self, user_client, journal,
+                                     django_assert_max_num_queries):
+        data = [{'text': f'Пост {number}', 'journal': journal.id}
+                for number in range(50)]
+        # Включая обновление счётчика постов журнала.
+        with django_assert_max_num_queries(11):
+            response = user_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
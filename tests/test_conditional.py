@@ -0,0 +1,113 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.utils.http import http_date
+
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    post_list_url = '/api/v1/posts/'
+    post_detail_url = '/api/v1/posts/{pk}/'
+    journal_detail_url = '/api/v1/journals/{pk}/'
+
+    def test_list_not_modified(self, user_client, user, journal,
+                               django_assert_num_queries):
+        Post.objects.create(text='Пост', author=user, journal=journal)
+        response = user_client.get(self.post_list_url)
+        etag = response['ETag']
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{self.post_list_url}` '
+            'содержит заголовок ETag.'
+        )
+        assert 'Last-Modified' not in response, (
+            'Проверьте, что список не отдаёт Last-Modified: он не '
+            'меняется при удалении записей.'
+        )
+
+        with django_assert_num_queries(1):
+            response = user_client.get(self.post_list_url,
+                                       HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадающем If-None-Match список '
+            'возвращает 304 без сериализации.'
+        )
+
+    def test_list_ignores_if_modified_since(self, user_client, user,
+                                            journal):
+        posts = [Post.objects.create(text=f'Пост {number}', author=user,
+                                     journal=journal) for number in range(2)]
+        since = http_date(time.time() + 60)
+        posts[0].delete()
+        response = user_client.get(self.post_list_url,
+                                   HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления поста список не отвечает 304 '
+            'на If-Modified-Since.'
+        )
+        assert len(response.json()) == 1
+
+    def test_cursor_page_etag(self, user_client, user, journal):
+        post = Post.objects.create(text='Пост', author=user, journal=journal)
+        params = {'cursor': '', 'limit': 5}
+        etag = user_client.get(self.post_list_url, params)['ETag']
+        response = user_client.get(self.post_list_url, params,
+                                   HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        post.delete()
+        response = user_client.get(self.post_list_url, params,
+                                   HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление поста со страницы курсора меняет ETag.'
+        )
+
+    def test_list_etag_changes(self, client, user, journal):
+        post = Post.objects.create(text='Пост', author=user,
+                                   journal=journal)
+        etag = client.get(self.post_list_url)['ETag']
+
+        post.text = 'Новый текст'
+        post.save()
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения поста ETag списка меняется.'
+        )
+        etag = response['ETag']
+
+        post.delete()
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления поста ETag списка меняется.'
+        )
+
+    def test_list_etag_depends_on_query(self, client, user, journal):
+        Post.objects.create(text='Пост', author=user, journal=journal)
+        etag = client.get(self.post_list_url)['ETag']
+        response = client.get(self.post_list_url, {'limit': 1},
+                              HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_detail_if_modified_since(self, client, user, journal):
+        post = Post.objects.create(text='Пост', author=user,
+                                   journal=journal)
+        url = self.post_detail_url.format(pk=post.pk)
+        last_modified = client.get(url)['Last-Modified']
+
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что детальный эндпоинт поддерживает '
+            'If-Modified-Since.'
+        )
+
+    def test_journal_detail_etag(self, user_client, journal):
+        url = self.journal_detail_url.format(pk=journal.pk)
+        etag = user_client.get(url)['ETag']
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        user_client.patch(url, data={'title': 'Другое'}, format='json')
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
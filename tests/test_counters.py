@@ -0,0 +1,144 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from posts.models import Follow, Journal, Post, Profile
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCounters:
+
+    def post_count(self, journal):
+        return Journal.objects.get(pk=journal.pk).post_count
+
+    def test_post_count(self, user, journal, private_journal):
+        post = Post.objects.create(text='Первый', author=user,
+                                   journal=journal)
+        Post.objects.create(text='Второй', author=user, journal=journal)
+        assert self.post_count(journal) == 2, (
+            'Проверьте, что создание поста увеличивает `post_count` журнала.'
+        )
+
+        post.journal = private_journal
+        post.save()
+        assert (self.post_count(journal),
+                self.post_count(private_journal)) == (1, 1), (
+            'Проверьте, что при переносе поста счётчики обоих журналов '
+            'обновляются.'
+        )
+
+        post.delete()
+        assert self.post_count(private_journal) == 0, (
+            'Проверьте, что удаление поста уменьшает `post_count`.'
+        )
+
+    def test_bulk_created_posts_counted(self, user, journal):
+        Post.objects.bulk_create([
+            Post(text=f'Пост {number}', author=user, journal=journal)
+            for number in range(3)
+        ])
+        assert self.post_count(journal) == 3
+
+    def test_post_keeps_journal_last_modified(self, user_client, user,
+                                              journal):
+        url = f'/api/v1/journals/{journal.id}/'
+        last_modified = Journal.objects.get(pk=journal.pk).last_modified
+        etag = user_client.get(url)['ETag']
+        Post.objects.create(text='Пост', author=user, journal=journal)
+        assert Journal.objects.get(pk=journal.pk).last_modified == \
+            last_modified, (
+                'Проверьте, что новый пост не меняет дату изменения '
+                'журнала и его место в списке.'
+            )
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag журнала учитывает `post_count`.'
+        )
+        assert 'Last-Modified' not in response
+
+    def test_journal_save_keeps_post_count(self, user, journal):
+        stale = Journal.objects.get(pk=journal.pk)
+        Post.objects.create(text='Пост', author=user, journal=journal)
+        stale.title = 'Новое название'
+        stale.save()
+        assert self.post_count(journal) == 1, (
+            'Проверьте, что Journal.save не перезаписывает `post_count` '
+            'устаревшим значением.'
+        )
+
+    def test_follow_counts(self, user, another_user):
+        follow = Follow.objects.create(user=user, following=another_user)
+        assert Profile.objects.get(user=user).following_count == 1
+        assert Profile.objects.get(user=another_user).followers_count == 1, (
+            'Проверьте, что подписка увеличивает счётчики обоих '
+            'пользователей.'
+        )
+        follow.delete()
+        assert Profile.objects.get(user=another_user).followers_count == 0
+
+    def test_journal_delete_no_per_post_updates(
+            self, user, journal, another_journal,
+            django_assert_max_num_queries):
+        Post.objects.create(text='Остаётся', author=user,
+                            journal=another_journal)
+        Post.objects.bulk_create([
+            Post(text=f'Пост {number}', author=user, journal=journal)
+            for number in range(50)
+        ])
+        with django_assert_max_num_queries(10):
+            journal.delete()
+        assert self.post_count(another_journal) == 1
+        Post.objects.filter(journal=another_journal).get().delete()
+        assert self.post_count(another_journal) == 0, (
+            'Проверьте, что после удаления журнала счётчики других '
+            'журналов снова обновляются.'
+        )
+
+    def test_user_delete_updates_follow_counts(
+            self, user, user_2, another_user, django_assert_max_num_queries):
+        Follow.objects.create(user=user, following=another_user)
+        Follow.objects.create(user=user_2, following=user)
+        Follow.objects.create(user=user_2, following=another_user)
+        with django_assert_max_num_queries(20):
+            user.delete()
+        assert Profile.objects.get(user=another_user).followers_count == 1
+        assert Profile.objects.get(user=user_2).following_count == 1, (
+            'Проверьте, что удаление пользователя уменьшает счётчики '
+            'тех, с кем он связан подписками.'
+        )
+
+    def test_rebuild_counters(self, user, another_user, journal):
+        Post.objects.create(text='Пост', author=user, journal=journal)
+        Follow.objects.create(user=user, following=another_user)
+        Journal.objects.update(post_count=0)
+        Profile.objects.filter(user=another_user).delete()
+
+        call_command('rebuild_counters')
+        assert self.post_count(journal) == 1
+        assert Profile.objects.get(user=another_user).followers_count == 1, (
+            'Проверьте, что `rebuild_counters` создаёт недостающие профили '
+            'и пересчитывает счётчики.'
+        )
+
+    def test_counts_in_api(self, user_client, user, another_user, journal,
+                           follow_1):
+        Post.objects.create(text='Пост', author=user, journal=journal)
+        data = user_client.get(f'/api/v1/journals/{journal.id}/').json()
+        assert data['post_count'] == 1, (
+            'Проверьте, что `post_count` отдаётся в ответе журнала.'
+        )
+
+        response = user_client.get('/api/v1/users/search/',
+                                   {'search': another_user.username})
+        found = response.json()[0]
+        assert (found['followers_count'], found['following_count']) == (
+            1, 0), (
+            'Проверьте, что поиск пользователей отдаёт счётчики подписок.'
+        )
+
+        data = user_client.get('/api/v1/users/me/').json()
+        assert (data['followers_count'], data['following_count']) == (
+            0, 1), (
+            'Проверьте, что `/users/me/` отдаёт счётчики подписок.'
+        )
@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+import zipfile
+from http import HTTPStatus
+
+import pytest
+from django.core.files.base import ContentFile
+
+from posts.models import ExportJob, Journal, Post
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('eager_tasks')
+class TestExportJobs:
+
+    url = '/api/v1/exports/'
+    detail_url = '/api/v1/exports/{pk}/'
+    download_url = '/api/v1/exports/{pk}/download/'
+
+    @pytest.fixture
+    def posts(self, user, journal):
+        return [
+            Post.objects.create(text=f'Запись {number}', author=user,
+                                journal=journal)
+            for number in range(3)
+        ]
+
+    def create_export(self, client, **data):
+        response = client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            f'Проверьте, что POST-запрос к `{self.url}` ставит выгрузку в '
+            'очередь и возвращает ответ со статусом 202.'
+        )
+        return response.json()['id']
+
+    def download(self, client, job_id):
+        response = client.get(self.detail_url.format(pk=job_id))
+        assert response.json()['status'] == ExportJob.DONE, (
+            'Проверьте, что выгрузка завершается со статусом `done`.'
+        )
+        response = client.get(self.download_url.format(pk=job_id))
+        assert response.status_code == HTTPStatus.OK
+        return b''.join(response.streaming_content)
+
+    def test_journal_jsonl(self, user_client, journal, posts):
+        job_id = self.create_export(user_client, journal=journal.id,
+                                    export_format='jsonl')
+        lines = [json.loads(line) for line in
+                 self.download(user_client, job_id).decode().splitlines()]
+
+        assert lines[0]['type'] == 'journal'
+        assert [line['text'] for line in lines[1:]] == [
+            post.text for post in posts
+        ], (
+            'Проверьте, что JSONL-выгрузка содержит все посты журнала '
+            'в порядке публикации.'
+        )
+
+    def test_account_csv(self, user_client, user, journal, posts):
+        other = Journal.objects.create(title='Второй', author=user)
+        Post.objects.create(text='Ещё запись', author=user, journal=other)
+        job_id = self.create_export(user_client, export_format='csv')
+        rows = list(csv.DictReader(
+            io.StringIO(self.download(user_client, job_id).decode())))
+
+        assert len(rows) == Post.objects.filter(author=user).count(), (
+            'Проверьте, что выгрузка аккаунта содержит посты всех журналов '
+            'пользователя.'
+        )
+
+    def test_zip_contains_images(self, user_client, user, journal):
+        post = Post(text='С картинкой', author=user, journal=journal)
+        post.image.save('picture.png', ContentFile(b'png-bytes'), save=False)
+        post.save()
+        job_id = self.create_export(user_client, journal=journal.id,
+                                    export_format='zip')
+        archive = zipfile.ZipFile(
+            io.BytesIO(self.download(user_client, job_id)))
+
+        assert f'images/{post.image.name}' in archive.namelist(), (
+            'Проверьте, что ZIP-выгрузка содержит изображения постов.'
+        )
+        assert 'С картинкой' in archive.read('export.md').decode()
+
+    def test_zip_shared_image_once(self, user_client, user, journal):
+        post = Post(text='Первый', author=user, journal=journal)
+        post.image.save('shared.png', ContentFile(b'png-bytes'), save=False)
+        post.save()
+        Post.objects.create(text='Второй', author=user, journal=journal,
+                            image=post.image.name)
+        job_id = self.create_export(user_client, journal=journal.id,
+                                    export_format='zip')
+        names = zipfile.ZipFile(
+            io.BytesIO(self.download(user_client, job_id))).namelist()
+
+        assert names.count(f'images/{post.image.name}') == 1, (
+            'Проверьте, что изображение, общее для нескольких постов, '
+            'попадает в ZIP-выгрузку один раз.'
+        )
+
+    def test_foreign_journal_rejected(self, user_client, another_journal):
+        response = user_client.post(
+            self.url,
+            data={'journal': another_journal.id, 'export_format': 'md'},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что нельзя выгрузить чужой журнал.'
+        )
+
+    def test_download_not_ready(self, user_client, user):
+        job = ExportJob.objects.create(user=user, export_format='md')
+        response = user_client.get(self.download_url.format(pk=job.pk))
+        assert response.status_code == HTTPStatus.CONFLICT
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Follow, Journal, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFeed:
+
+    url = '/api/v1/feed/'
+
+    def feed_ids(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return [item['id'] for item in response.json()]
+
+    def test_feed_not_auth(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_feed_contains_followed_posts(self, user_client, another_user,
+                                          user_2, follow_1):
+        own_journal = Journal.objects.create(title='J', author=another_user)
+        first = Post.objects.create(text='1', author=another_user,
+                                    journal=own_journal)
+        second = Post.objects.create(text='2', author=another_user,
+                                     journal=own_journal)
+        stranger = Journal.objects.create(title='S', author=user_2)
+        Post.objects.create(text='3', author=user_2, journal=stranger)
+
+        assert self.feed_ids(user_client) == [second.id, first.id], (
+            'Проверьте, что лента содержит посты авторов из подписок '
+            'от новых к старым.'
+        )
+
+    def test_feed_backfill_and_unfollow(self, user_client, user,
+                                        another_user, another_journal):
+        post = Post.objects.create(text='Ранний пост', author=another_user,
+                                   journal=another_journal)
+        follow = Follow.objects.create(user=user, following=another_user)
+        assert self.feed_ids(user_client) == [post.id], (
+            'Проверьте, что при подписке в ленту попадают уже '
+            'опубликованные посты автора.'
+        )
+
+        follow.delete()
+        assert self.feed_ids(user_client) == [], (
+            'Проверьте, что после отписки посты автора пропадают из ленты.'
+        )
+
+    def test_feed_hides_private(self, user_client, another_user,
+                                another_journal, follow_1):
+        post = Post.objects.create(text='Пост', author=another_user,
+                                   journal=another_journal)
+        another_journal.is_private = True
+        another_journal.save()
+        assert self.feed_ids(user_client) == []
+
+        another_journal.is_private = False
+        another_journal.save()
+        assert self.feed_ids(user_client) == [post.id], (
+            'Проверьте, что посты журнала, снова ставшего публичным, '
+            'возвращаются в ленту.'
+        )
+
+    def test_feed_query_count(self, user_client, another_user,
+                              another_journal, follow_1,
+                              django_assert_num_queries):
+        for number in range(10):
+            Post.objects.create(text=f'Пост {number}', author=another_user,
+                                journal=another_journal)
+        with django_assert_num_queries(2):
+            user_client.get(self.url)
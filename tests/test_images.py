@@ -0,0 +1,220 @@
+import base64
+import io
+import os
+from http import HTTPStatus
+
+import pytest
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from posts.models import Journal, Post
+
+
+def make_png(width=1200, height=900, noise=False):
+    if noise:
+        image = Image.frombytes('RGB', (width, height),
+                                os.urandom(width * height * 3))
+    else:
+        image = Image.new('RGB', (width, height), 'red')
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('eager_tasks')
+class TestImageVariants:
+
+    post_url = '/api/v1/posts/'
+    journal_url = '/api/v1/journals/'
+
+    @property
+    def data_uri(self):
+        return 'data:image/png;base64,' + base64.b64encode(
+            make_png()).decode()
+
+    def check_variants(self, instance, settings):
+        for field, size in settings.IMAGE_VARIANTS.items():
+            variant = getattr(instance, field)
+            assert variant, (
+                f'Проверьте, что после загрузки изображения заполняется '
+                f'поле `{field}`.'
+            )
+            with Image.open(variant.open('rb')) as image:
+                assert image.width <= size[0] and image.height <= size[1], (
+                    f'Проверьте, что `{field}` не больше {size}.'
+                )
+
+    def test_post_variants(self, user_client, journal, settings):
+        response = user_client.post(
+            self.post_url,
+            data={'text': 'С картинкой', 'journal': journal.id,
+                  'image': self.data_uri},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        post = Post.objects.get(pk=response.json()['id'])
+        self.check_variants(post, settings)
+
+        data = user_client.get(f'{self.post_url}{post.id}/').json()
+        assert data['image_thumbnail'] and data['image_medium'], (
+            'Проверьте, что варианты изображения отдаются в ответе API.'
+        )
+
+    def test_journal_variants(self, user_client, settings):
+        response = user_client.post(
+            self.journal_url,
+            data={'title': 'Журнал', 'image': self.data_uri},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        journal = Journal.objects.get(pk=response.json()['id'])
+        self.check_variants(journal, settings)
+
+    def test_variants_are_read_only(self, user_client, journal):
+        response = user_client.post(
+            self.post_url,
+            data={'text': 'Без картинки', 'journal': journal.id,
+                  'image_thumbnail': self.data_uri},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['image_thumbnail'] is None, (
+            'Проверьте, что варианты изображения нельзя передать в запросе.'
+        )
+
+    def test_variants_rebuilt_on_change(self, user, journal, settings):
+        post = Post(text='Запись', author=user, journal=journal)
+        post.image.save('first.png', ContentFile(make_png()))
+        post.refresh_from_db()
+        first = post.image_thumbnail.name
+
+        post.image.save('second.png', ContentFile(make_png(300, 300)))
+        post.refresh_from_db()
+        assert post.image_thumbnail.name != first, (
+            'Проверьте, что при смене изображения варианты строятся заново.'
+        )
+        self.check_variants(post, settings)
+
+    def test_anonymous_cache_invalidated(self, client, user, journal):
+        post = Post.objects.create(text='Запись', author=user,
+                                   journal=journal)
+        client.get(self.post_url)
+        post.image.save('picture.png', ContentFile(make_png()))
+
+        data = client.get(self.post_url).json()
+        assert data[0]['image_thumbnail'], (
+            'Проверьте, что кеш ответов сбрасывается после построения '
+            'вариантов изображения.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('eager_tasks')
+class TestImageUpload:
+
+    url = '/api/v1/posts/'
+
+    def post_image(self, client, journal, image, **kwargs):
+        return client.post(
+            self.url,
+            data={'text': 'С картинкой', 'journal': journal.id,
+                  'image': image},
+            **kwargs
+        )
+
+    def test_base64_larger_than_chunk(self, user_client, journal):
+        content = make_png(200, 200, noise=True)
+        image = 'data:image/png;base64,' + base64.b64encode(content).decode()
+        assert len(image) > 64 * 1024
+        response = self.post_image(user_client, journal, image,
+                                   format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что изображение в base64 больше одного куска '
+            'декодируется целиком.'
+        )
+        post = Post.objects.get(pk=response.json()['id'])
+        assert post.image.read() == content
+
+    def test_base64_with_line_breaks(self, user_client, journal):
+        content = make_png(200, 200, noise=True)
+        image = 'data:image/png;base64,' + base64.encodebytes(
+            content).decode()
+        assert len(image) > 64 * 1024
+        response = self.post_image(user_client, journal, image,
+                                   format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что base64 с переносами строк принимается.'
+        )
+        post = Post.objects.get(pk=response.json()['id'])
+        assert post.image.read() == content
+
+    def test_base64_decoded_to_disk(self):
+        from api.serializers import Base64ImageField
+
+        image = 'data:image/png;base64,' + base64.b64encode(
+            make_png()).decode()
+        upload = Base64ImageField().decode_data_uri(image)
+        try:
+            assert os.path.exists(upload.temporary_file_path()), (
+                'Проверьте, что base64 декодируется во временный файл на '
+                'диске, который ImageField открывает по пути.'
+            )
+        finally:
+            upload.close()
+
+    def test_json_body_too_large(self, user_client, journal, settings):
+        settings.JSON_BODY_MAX_SIZE = 1024
+        image = 'data:image/png;base64,' + base64.b64encode(
+            make_png(200, 200, noise=True)).decode()
+        response = self.post_image(user_client, journal, image,
+                                   format='json')
+        assert response.status_code == \
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE, (
+                'Проверьте, что тело JSON-запроса больше '
+                '`JSON_BODY_MAX_SIZE` отклоняется.'
+            )
+        assert not Post.objects.exists()
+
+    def test_base64_too_large(self, user_client, journal, settings):
+        settings.IMAGE_UPLOAD_MAX_SIZE = 1024
+        image = 'data:image/png;base64,' + base64.b64encode(
+            make_png()).decode()
+        response = self.post_image(user_client, journal, image,
+                                   format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что изображение больше `IMAGE_UPLOAD_MAX_SIZE` '
+            'отклоняется.'
+        )
+        assert 'image' in response.json()
+
+    @pytest.mark.parametrize('image', [
+        'data:image/png;base64,' + base64.b64encode(b'not an image').decode(),
+        'data:image/png;base64,@@@@',
+        'data:image/png,no-base64',
+    ])
+    def test_base64_rejected(self, user_client, journal, image):
+        response = self.post_image(user_client, journal, image,
+                                   format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректные данные base64 и файлы, '
+            'не являющиеся изображениями, отклоняются.'
+        )
+        assert not Post.objects.exists()
+
+    def test_multipart(self, user_client, journal, settings):
+        upload = io.BytesIO(make_png())
+        upload.name = 'picture.png'
+        response = self.post_image(user_client, journal, upload,
+                                   format='multipart')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что изображение можно загрузить через multipart.'
+        )
+
+        settings.IMAGE_UPLOAD_MAX_SIZE = 1024
+        upload.seek(0)
+        response = self.post_image(user_client, journal, upload,
+                                   format='multipart')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что размер файла multipart тоже ограничен.'
+        )
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+from urllib.parse import quote
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from posts.models import Journal, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestJournalTextExport:
+
+    url = '/api/v1/journals/{pk}/export/'
+
+    @pytest.fixture
+    def another_client(self, another_user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(another_user)}')
+        return client
+
+    @pytest.fixture
+    def pin_journal(self, user):
+        journal = Journal(title='С PIN', author=user, is_private=True)
+        journal.set_pin('1234')
+        journal.save()
+        return journal
+
+    def export(self, client, journal):
+        return client.get(self.url.format(pk=journal.pk))
+
+    def test_streamed_text(self, user_client, user, journal):
+        for number in range(3):
+            Post.objects.create(text=f'Запись {number}', author=user,
+                                journal=journal)
+        response = self.export(user_client, journal)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка журнала отдаётся потоком.'
+        )
+        assert response['Content-Disposition'] == (
+            "attachment; filename*=utf-8''"
+            f"{quote(journal.title + '_export.txt')}"), (
+            'Проверьте, что не-ASCII имя файла передаётся через filename*.'
+        )
+        text = b''.join(response.streaming_content).decode()
+        assert text.startswith(f'Дневник: {journal.title}\n')
+        assert f'Автор: {user.username}' in text
+        positions = [text.index(f'\n{number + 1}. Запись {number}\n')
+                     for number in range(3)]
+        assert positions == sorted(positions), (
+            'Проверьте, что записи выгружаются по порядку публикации '
+            'и пронумерованы.'
+        )
+        assert text.count('Дата создания: ') == 3
+
+    def test_query_count_constant(self, user_client, user, journal,
+                                  django_assert_num_queries):
+        for number in range(20):
+            Post.objects.create(text=f'Запись {number}', author=user,
+                                journal=journal)
+        # Пользователь попадает в кеш аутентификации.
+        self.export(user_client, journal)
+        with django_assert_num_queries(2):
+            response = self.export(user_client, journal)
+            b''.join(response.streaming_content)
+
+    @pytest.mark.parametrize('journal_fixture', (
+        'journal', 'private_journal', 'pin_journal'))
+    def test_only_author(self, request, client, user_client, another_client,
+                         journal_fixture):
+        journal = request.getfixturevalue(journal_fixture)
+        assert self.export(client, journal).status_code == \
+            HTTPStatus.UNAUTHORIZED
+        assert self.export(another_client, journal).status_code == \
+            HTTPStatus.FORBIDDEN, (
+                'Проверьте, что чужой журнал выгрузить нельзя, в том '
+                'числе приватный и с PIN.'
+            )
+        assert self.export(user_client, journal).status_code == \
+            HTTPStatus.OK
+
+    def test_missing_journal(self, user_client):
+        response = user_client.get(self.url.format(pk=0))
+        assert response.status_code == HTTPStatus.NOT_FOUND
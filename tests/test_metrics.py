@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from journals import metrics
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPerformanceMetrics:
+
+    url = '/api/v1/metrics/'
+
+    @pytest.fixture(autouse=True)
+    def clean_metrics(self, settings):
+        settings.PERFORMANCE_METRICS = {'SAMPLE_RATE': 1}
+        metrics.reset()
+        yield
+        metrics.reset()
+
+    @pytest.fixture
+    def admin_client(self, django_user_model):
+        admin = django_user_model.objects.create_superuser(
+            username='admin', password='1234567')
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}')
+        return client
+
+    def test_metrics_export(self, user_client, admin_client, journal):
+        user_client.get('/api/v1/posts/')
+        response = admin_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        for line in (
+            '# TYPE journals_request_duration_seconds histogram',
+            'journals_request_duration_seconds_count'
+            '{method="GET",view="post-list"} 1',
+            'journals_request_duration_seconds_bucket'
+            '{method="GET",view="post-list",le="+Inf"} 1',
+            'journals_request_db_queries_count'
+            '{method="GET",view="post-list"} 1',
+            'journals_request_render_duration_seconds_count'
+            '{method="GET",view="post-list"} 1',
+            'journals_response_size_bytes_count'
+            '{method="GET",view="post-list"} 1',
+        ):
+            assert line in text, (
+                f'Проверьте, что `{self.url}` отдаёт метрики в формате '
+                f'Prometheus: нет строки `{line}`.'
+            )
+
+    def test_metrics_admin_only(self, client, user_client):
+        assert client.get(self.url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(self.url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.url}` доступен только администраторам.'
+        )
+
+    def test_server_timing_in_debug(self, user_client, settings):
+        settings.DEBUG = True
+        response = user_client.get('/api/v1/posts/')
+        timing = response['Server-Timing']
+        for phase in ('total;dur=', 'db;dur=', 'app;dur=', 'render;dur='):
+            assert phase in timing, (
+                'Проверьте, что в DEBUG замеры отдаются в `Server-Timing`.'
+            )
+        settings.DEBUG = False
+        assert 'Server-Timing' not in user_client.get('/api/v1/posts/')
+
+    def test_sampling_off(self, user_client, settings):
+        settings.PERFORMANCE_METRICS = {'SAMPLE_RATE': 0}
+        settings.DEBUG = True
+        response = user_client.get('/api/v1/posts/')
+        assert 'Server-Timing' not in response
+        assert metrics.export().count('_count{') == 0, (
+            'Проверьте, что при SAMPLE_RATE = 0 запросы не замеряются.'
+        )
+
+    def test_disabled(self, admin_client, user_client, settings):
+        settings.PERFORMANCE_METRICS = {'SAMPLE_RATE': 0}
+        user_client.get('/api/v1/posts/')
+        assert admin_client.get(self.url).status_code == \
+            HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что без замеров `{self.url}` недоступен.'
+            )
@@ -0,0 +1,147 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Journal, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestKeysetPagination:
+
+    post_list_url = '/api/v1/posts/'
+    journal_list_url = '/api/v1/journals/'
+
+    def collect_pages(self, client, url, limit):
+        pages = []
+        response = client.get(url, {'cursor': '', 'limit': limit})
+        while True:
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` с параметром `cursor` '
+                'возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            pages.append(data)
+            if not data['next']:
+                return pages
+            response = client.get(data['next'])
+
+    def test_post_cursor_pages_match_ordering(self, user_client, user,
+                                              journal):
+        for number in range(7):
+            Post.objects.create(
+                text=f'Пост {number % 3}', author=user, journal=journal
+            )
+        pages = self.collect_pages(user_client, self.post_list_url, limit=3)
+
+        assert [len(page['results']) for page in pages] == [3, 3, 1], (
+            'Проверьте, что keyset-пагинация делит посты на страницы '
+            'размером `limit`.'
+        )
+        assert 'count' not in pages[0], (
+            'Проверьте, что keyset-пагинация не считает общее количество '
+            'записей.'
+        )
+        ids = [item['id'] for page in pages for item in page['results']]
+        expected = list(
+            Post.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        assert ids == expected, (
+            'Проверьте, что keyset-пагинация возвращает посты в порядке '
+            '`Meta.ordering` без пропусков и повторов.'
+        )
+
+    def test_post_cursor_previous_link(self, user_client, user, journal):
+        for number in range(5):
+            Post.objects.create(
+                text=f'Пост {number}', author=user, journal=journal
+            )
+        pages = self.collect_pages(user_client, self.post_list_url, limit=2)
+        response = user_client.get(pages[-1]['previous'])
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка `previous` keyset-пагинации возвращает '
+            'предыдущую страницу.'
+        )
+
+    def test_journal_cursor_pagination(self, user_client, user):
+        for number in range(4):
+            Journal.objects.create(title=f'Журнал {number}', author=user)
+        pages = self.collect_pages(
+            user_client, self.journal_list_url, limit=3
+        )
+        ids = [item['id'] for page in pages for item in page['results']]
+        expected = list(
+            Journal.objects.order_by('-last_modified', 'title', 'id')
+            .values_list('id', flat=True)
+        )
+        assert ids == expected, (
+            'Проверьте, что keyset-пагинация возвращает журналы в порядке '
+            '`Meta.ordering`.'
+        )
+
+    def test_invalid_cursor(self, user_client):
+        response = user_client.get(self.post_list_url, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что некорректный курсор возвращает ответ со '
+            'статусом 404.'
+        )
+
+    @pytest.mark.parametrize('values', (
+        ['notadate', 1],
+        ['2020-01-01T00:00:00', 'abc'],
+        [[1], {}],
+        [None, 1],
+    ))
+    def test_tampered_cursor(self, user_client, values):
+        cursor = base64.urlsafe_b64encode(
+            json.dumps({'v': values, 'r': 0}).encode()).decode()
+        response = user_client.get(self.post_list_url, {'cursor': cursor})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что курсор со значениями неверных типов '
+            'возвращает ответ со статусом 404.'
+        )
+
+    def test_cursor_with_search(self, user_client, user, journal):
+        Post.objects.create(text='кот', author=user, journal=journal)
+        response = user_client.get(self.post_list_url,
+                                   {'cursor': '', 'search': 'кот'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что курсор нельзя сочетать с поиском: keyset не '
+            'листает выборку, отсортированную по релевантности.'
+        )
+        response = user_client.get(self.post_list_url,
+                                   {'cursor': '', 'search': ''})
+        assert response.status_code == HTTPStatus.OK
+
+    def test_limit_offset_is_default(self, user_client, user, journal):
+        Post.objects.create(text='Пост', author=user, journal=journal)
+        response = user_client.get(self.post_list_url, {'limit': 1})
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `cursor` используется '
+            'LimitOffsetPagination.'
+        )
+
+    def test_legacy_text_ordering(self, user_client, user, journal,
+                                  settings):
+        settings.POSTS_LEGACY_TEXT_ORDERING = True
+        posts = [
+            Post.objects.create(text=text, author=user, journal=journal)
+            for text in ('б', 'в', 'а')
+        ]
+        Post.objects.update(pub_date=posts[0].pub_date)
+        expected = [posts[2].id, posts[0].id, posts[1].id]
+
+        response = user_client.get(self.post_list_url)
+        assert [item['id'] for item in response.json()] == expected, (
+            'Проверьте, что при `POSTS_LEGACY_TEXT_ORDERING` посты с '
+            'одинаковой датой сортируются по тексту.'
+        )
+        pages = self.collect_pages(user_client, self.post_list_url, limit=2)
+        ids = [item['id'] for page in pages for item in page['results']]
+        assert ids == expected, (
+            'Проверьте, что keyset-пагинация учитывает '
+            '`POSTS_LEGACY_TEXT_ORDERING`.'
+        )
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+
+from posts.models import Journal
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCheckPin:
+
+    url = '/api/v1/journals/{pk}/check-pin/'
+
+    @pytest.fixture(autouse=True)
+    def clear_throttle(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def pin_journal(self, user):
+        journal = Journal(title='С PIN', author=user, is_private=True)
+        journal.set_pin('1234')
+        journal.save()
+        return journal
+
+    def check(self, client, journal, **data):
+        return client.post(self.url.format(pk=journal.pk), data=data,
+                           format='json')
+
+    def test_pin_uses_light_hasher(self, pin_journal):
+        assert pin_journal.pin_code.startswith('pbkdf2_sha256_pin$'), (
+            'Проверьте, что PIN хешируется алгоритмом JOURNAL_PIN_HASHER.'
+        )
+
+    def test_token_skips_hashing(self, user_client, pin_journal,
+                                 monkeypatch):
+        response = self.check(user_client, pin_journal, pin='1234')
+        assert response.status_code == HTTPStatus.OK
+        token = response.json()['token']
+
+        def fail(*args, **kwargs):
+            raise AssertionError('PIN не должен хешироваться повторно.')
+
+        monkeypatch.setattr('posts.models.check_password', fail)
+        response = self.check(user_client, pin_journal, token=token)
+        assert response.json()['valid'] is True, (
+            'Проверьте, что токен успешной проверки принимается вместо PIN.'
+        )
+
+    def test_token_invalid_after_pin_change(self, user_client, pin_journal):
+        token = self.check(user_client, pin_journal,
+                           pin='1234').json()['token']
+        pin_journal.set_pin('5678')
+        pin_journal.save()
+
+        response = self.check(user_client, pin_journal, token=token)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после смены PIN старый токен недействителен.'
+        )
+
+    def test_failed_attempts_throttled(self, user_client, pin_journal,
+                                       settings):
+        for _ in range(5):
+            response = self.check(user_client, pin_journal, pin='0000')
+            assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = self.check(user_client, pin_journal, pin='1234')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что после серии неверных PIN проверка блокируется.'
+        )
+
+    def test_success_not_throttled(self, user_client, pin_journal):
+        for _ in range(10):
+            response = self.check(user_client, pin_journal, pin='1234')
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что успешные проверки не расходуют лимит.'
+            )
+
+    def test_legacy_hash_upgraded(self, user_client, pin_journal):
+        Journal.objects.filter(pk=pin_journal.pk).update(
+            pin_code=make_password('1234'))
+
+        self.check(user_client, pin_journal, pin='1234')
+        pin_journal.refresh_from_db()
+        assert pin_journal.pin_code.startswith('pbkdf2_sha256_pin$'), (
+            'Проверьте, что PIN со старым хешем перехешируется при успешной '
+            'проверке.'
+        )
@@ -0,0 +1,115 @@
+import pytest
+
+from posts.models import Journal, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryCount:
+    '''
+    Фиксирует количество SQL-запросов на эндпоинтах списков и деталей,
+    чтобы не вернуть N+1 при сериализации автора.
+    '''
+
+    post_list_url = '/api/v1/posts/'
+    post_detail_url = '/api/v1/posts/{pk}/'
+    journal_list_url = '/api/v1/journals/'
+    journal_detail_url = '/api/v1/journals/{pk}/'
+
+    # Пользователь берётся из кеша CachedJWTAuthentication.
+    AUTH_QUERIES = 0
+    # ETag списка считается по самой странице, без отдельного агрегата.
+    VALIDATOR_QUERIES = 0
+
+    @pytest.fixture
+    def user_client(self, user_client):
+        # Первый запрос загружает пользователя в кеш аутентификации.
+        user_client.get(self.journal_list_url)
+        return user_client
+
+    @pytest.fixture
+    def many_posts(self, user, another_user, journal, another_journal):
+        posts = []
+        for number in range(10):
+            posts.append(Post.objects.create(
+                text=f'Пост {number}', author=user, journal=journal))
+            posts.append(Post.objects.create(
+                text=f'Чужой пост {number}', author=another_user,
+                journal=another_journal))
+        return posts
+
+    @pytest.fixture
+    def many_journals(self, user, another_user):
+        return [
+            Journal.objects.create(title=f'Журнал {number}',
+                                   author=(user, another_user)[number % 2])
+            for number in range(10)
+        ]
+
+    def test_post_list_anonymous(self, client, many_posts,
+                                 django_assert_num_queries):
+        with django_assert_num_queries(self.VALIDATOR_QUERIES + 1):
+            response = client.get(self.post_list_url)
+        assert len(response.json()) == len(many_posts)
+
+    def test_post_list_auth(self, user_client, many_posts,
+                            django_assert_num_queries):
+        with django_assert_num_queries(
+                self.AUTH_QUERIES + self.VALIDATOR_QUERIES + 1):
+            response = user_client.get(self.post_list_url)
+        assert len(response.json()) == len(many_posts)
+
+    def test_post_list_paginated(self, user_client, many_posts,
+                                 django_assert_num_queries):
+        with django_assert_num_queries(
+                self.AUTH_QUERIES + self.VALIDATOR_QUERIES + 2):
+            user_client.get(self.post_list_url, {'limit': 5, 'offset': 5})
+
+    def test_post_list_cursor(self, user_client, many_posts,
+                              django_assert_num_queries):
+        with django_assert_num_queries(
+                self.AUTH_QUERIES + self.VALIDATOR_QUERIES + 1):
+            user_client.get(self.post_list_url, {'cursor': '', 'limit': 5})
+
+    def test_post_detail(self, user_client, many_posts,
+                         django_assert_num_queries):
+        url = self.post_detail_url.format(pk=many_posts[0].pk)
+        with django_assert_num_queries(self.AUTH_QUERIES + 1):
+            user_client.get(url)
+
+    def test_journal_list_anonymous(self, client, many_journals,
+                                    django_assert_num_queries):
+        with django_assert_num_queries(self.VALIDATOR_QUERIES + 1):
+            response = client.get(self.journal_list_url)
+        assert len(response.json()) == len(many_journals)
+
+    def test_journal_list_auth(self, user_client, many_journals,
+                               django_assert_num_queries):
+        with django_assert_num_queries(
+                self.AUTH_QUERIES + self.VALIDATOR_QUERIES + 1):
+            user_client.get(self.journal_list_url)
+
+    def test_journal_detail(self, user_client, many_journals,
+                            django_assert_num_queries):
+        url = self.journal_detail_url.format(pk=many_journals[0].pk)
+        with django_assert_num_queries(self.AUTH_QUERIES + 1):
+            user_client.get(url)
+
+    def test_post_save_does_not_read_journal(self, many_posts,
+                                             django_assert_num_queries):
+        post = Post.objects.get(pk=many_posts[0].pk)
+        post.is_private = True
+        with django_assert_num_queries(1):
+            post.save()
+
+    def test_journal_save_does_not_reread(self, journal,
+                                          django_assert_num_queries):
+        journal = Journal.objects.get(pk=journal.pk)
+        journal.title = 'Новое название'
+        with django_assert_num_queries(1):
+            journal.save()
+
+        journal.is_private = True
+        with django_assert_num_queries(2):
+            journal.save()
+        with django_assert_num_queries(1):
+            journal.save()
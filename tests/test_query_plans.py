@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import ExportJob, Follow, Post
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='Проверяются планы SQLite.')
+class TestQueryPlans:
+    '''
+    Запросы, которые эндпоинты выполняют к своей основной таблице, должны
+    читать её через индекс и не сортировать результат во временном B-дереве.
+    '''
+
+    @pytest.fixture
+    def data(self, user, another_user, journal, another_journal):
+        for number in range(3):
+            Post.objects.create(text=f'Пост {number}', author=user,
+                                journal=journal)
+            Post.objects.create(text=f'Чужой {number}', author=another_user,
+                                journal=another_journal)
+        Follow.objects.create(user=user, following=another_user)
+        ExportJob.objects.create(user=user, export_format=ExportJob.JSONL)
+        return journal
+
+    def plans(self, client, url, table):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, url
+        plans = {}
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query['sql']
+                if sql.startswith('SELECT') and f'FROM "{table}"' in sql:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plans[sql] = [row[-1] for row in cursor.fetchall()]
+        assert plans, f'Не найдено запросов к `{table}` для `{url}`.'
+        return plans
+
+    @pytest.mark.parametrize('url, table', [
+        ('/api/v1/posts/?limit=10', 'posts_post'),
+        ('/api/v1/posts/?cursor=&limit=10', 'posts_post'),
+        ('/api/v1/posts/?author__username=TestUser&limit=10', 'posts_post'),
+        ('/api/v1/posts/?journal={journal}&limit=10', 'posts_post'),
+        ('/api/v1/journals/?limit=10', 'posts_journal'),
+        ('/api/v1/journals/?author__username=TestUser&limit=10',
+         'posts_journal'),
+        ('/api/v1/feed/?limit=10', 'posts_timelineentry'),
+        ('/api/v1/exports/', 'posts_exportjob'),
+    ])
+    def test_uses_indexes(self, user_client, data, url, table):
+        url = url.format(journal=data.id)
+        for sql, plan in self.plans(user_client, url, table).items():
+            assert f'SCAN {table}' not in plan, (
+                f'Проверьте, что запрос `{url}` к `{table}` использует '
+                f'индекс, а не полный просмотр таблицы: {plan}\n{sql}'
+            )
+            assert not any('TEMP B-TREE' in step for step in plan), (
+                f'Проверьте, что индекс покрывает сортировку запроса '
+                f'`{url}`: {plan}\n{sql}'
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != 'postgresql',
+                    reason='Проверяется план PostgreSQL.')
+class TestPostgresSearchPlan:
+
+    def test_search_uses_gin_index(self, user, journal):
+        from posts.search import PostgresSearchBackend
+
+        for number in range(3):
+            Post.objects.create(text=f'Прогулка {number}', author=user,
+                                journal=journal)
+        queryset = PostgresSearchBackend().search(Post.objects.all(),
+                                                  'прогулка')
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # На маленькой таблице планировщик и так выбрал бы Seq Scan.
+            cursor.execute('SET enable_seqscan = off')
+            try:
+                cursor.execute(f'EXPLAIN {sql}', params)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+            finally:
+                cursor.execute('RESET enable_seqscan')
+        assert 'posts_post_text_fts_idx' in plan, (
+            'Проверьте, что выражение поиска совпадает с выражением '
+            f'GIN-индекса и индекс используется:\n{plan}'
+        )
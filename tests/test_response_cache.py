@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import transaction
+
+from api.cache import get_versions
+from posts.models import Journal, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAnonymousResponseCache:
+
+    post_list_url = '/api/v1/posts/'
+    journal_list_url = '/api/v1/journals/'
+
+    def test_cached_list_no_queries(self, client, user, journal,
+                                    django_assert_num_queries):
+        Post.objects.create(text='Пост', author=user, journal=journal)
+        first = client.get(self.post_list_url)
+
+        with django_assert_num_queries(0):
+            second = client.get(self.post_list_url)
+        assert second.json() == first.json(), (
+            'Проверьте, что повторный анонимный запрос к списку постов '
+            'отдаётся из кеша без запросов к БД.'
+        )
+        assert second['ETag'] == first['ETag']
+
+    def test_cached_list_not_modified(self, client, user, journal):
+        Post.objects.create(text='Пост', author=user, journal=journal)
+        etag = client.get(self.post_list_url)['ETag']
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_post_change_invalidates(self, client, user, journal):
+        post = Post.objects.create(text='Старый', author=user,
+                                   journal=journal)
+        client.get(self.post_list_url)
+        post.text = 'Новый'
+        post.save()
+
+        response = client.get(self.post_list_url)
+        assert response.json()[0]['text'] == 'Новый', (
+            'Проверьте, что изменение поста сбрасывает кеш списка.'
+        )
+
+    def test_journal_privacy_invalidates_posts(self, client, user,
+                                               journal):
+        Post.objects.create(text='Пост', author=user, journal=journal)
+        assert len(client.get(self.post_list_url).json()) == 1
+        journal.is_private = True
+        journal.save()
+
+        assert client.get(self.post_list_url).json() == [], (
+            'Проверьте, что смена приватности журнала сбрасывает кеш '
+            'списка постов.'
+        )
+
+    def test_query_params_in_key(self, client, user):
+        Journal.objects.create(title='Первый', author=user)
+        Journal.objects.create(title='Второй', author=user)
+        client.get(self.journal_list_url)
+        response = client.get(self.journal_list_url, {'limit': 1})
+        assert len(response.json()['results']) == 1
+
+    def test_authenticated_not_cached(self, user_client, user, journal):
+        post = Post.objects.create(text='Пост', author=user,
+                                   journal=journal)
+        user_client.get(self.post_list_url)
+        # update() не отправляет сигналов, версия кеша не меняется.
+        Post.objects.filter(pk=post.pk).update(text='Изменён')
+
+        response = user_client.get(self.post_list_url)
+        assert response.json()[0]['text'] == 'Изменён', (
+            'Проверьте, что ответы авторизованным пользователям не '
+            'кешируются.'
+        )
+
+    def test_host_in_key(self, client, user, settings):
+        settings.ALLOWED_HOSTS = ['*']
+        for number in range(2):
+            Journal.objects.create(title=f'Журнал {number}', author=user)
+        client.get(self.journal_list_url, {'limit': 1},
+                   HTTP_HOST='first.example')
+        response = client.get(self.journal_list_url, {'limit': 1},
+                              HTTP_HOST='second.example')
+        assert response.json()['next'].startswith('http://second.example/'), (
+            'Проверьте, что ответы с абсолютными ссылками кешируются '
+            'отдельно для каждого хоста.'
+        )
+
+    def test_version_bumped_after_commit(self, user, journal):
+        before = get_versions(['post'])
+        with transaction.atomic():
+            Post.objects.create(text='Пост', author=user, journal=journal)
+            assert get_versions(['post']) == before, (
+                'Проверьте, что версия кеша меняется только после коммита '
+                'транзакции.'
+            )
+        assert get_versions(['post']) != before
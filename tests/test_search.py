@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostSearch:
+
+    url = '/api/v1/posts/'
+
+    def search(self, client, query):
+        response = client.get(self.url, {'search': query})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` с параметром `search` '
+            'возвращает ответ со статусом 200.'
+        )
+        return [item['id'] for item in response.json()]
+
+    def test_search_prefix(self, client, user, journal):
+        match = Post.objects.create(
+            text='Сегодня писал журнал', author=user, journal=journal)
+        Post.objects.create(text='Другая запись', author=user,
+                            journal=journal)
+
+        assert self.search(client, 'журн') == [match.id], (
+            'Проверьте, что поиск находит посты по префиксу слова.'
+        )
+
+    def test_search_ranking(self, client, user, journal):
+        weak = Post.objects.create(
+            text='кот и длинный текст про совсем другие вещи и события',
+            author=user, journal=journal)
+        strong = Post.objects.create(
+            text='кот кот кот', author=user, journal=journal)
+
+        assert self.search(client, 'кот') == [strong.id, weak.id], (
+            'Проверьте, что результаты поиска отсортированы по '
+            'релевантности.'
+        )
+
+    def test_search_index_follows_changes(self, client, user, journal):
+        post = Post.objects.create(text='старый текст', author=user,
+                                   journal=journal)
+        post.text = 'новый текст'
+        post.save()
+        assert self.search(client, 'старый') == []
+        assert self.search(client, 'новый') == [post.id]
+
+        post.delete()
+        assert self.search(client, 'новый') == [], (
+            'Проверьте, что удалённый пост пропадает из поискового индекса.'
+        )
+
+    def test_search_index_follows_queryset_changes(self, client, user,
+                                                   journal):
+        post = Post.objects.create(text='старый текст', author=user,
+                                   journal=journal)
+        Post.objects.filter(pk=post.pk).update(text='новый текст')
+        assert self.search(client, 'новый') == [post.id], (
+            'Проверьте, что индекс обновляется и при QuerySet.update().'
+        )
+
+        journal.delete()
+        assert self.search(client, 'новый') == [], (
+            'Проверьте, что посты удалённого журнала пропадают из '
+            'поискового индекса.'
+        )
+
+    def test_search_respects_visibility(self, client, user, private_journal):
+        Post.objects.create(text='секретная запись', author=user,
+                            journal=private_journal)
+        assert self.search(client, 'секретная') == [], (
+            'Проверьте, что поиск не показывает чужие приватные посты.'
+        )
@@ -0,0 +1,69 @@
+import io
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+
+from posts.models import Follow, Journal, Post, Profile, TimelineEntry
+from posts.search import get_search_backend
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('eager_tasks')
+class TestSeedCommand:
+
+    def seed(self, **options):
+        options = dict(users=40, journals=60, posts=500, follows=6,
+                       image_share=0.2, batch_size=64, seed=7, **options)
+        call_command('seed', stdout=io.StringIO(), **options)
+
+    def test_counts_and_distributions(self, django_user_model):
+        self.seed()
+        assert django_user_model.objects.count() == 40
+        assert Profile.objects.count() == 40, (
+            'Проверьте, что у созданных пользователей есть профили.'
+        )
+        assert Journal.objects.count() == 60
+        assert Post.objects.count() == 500
+        assert Journal.objects.filter(is_private=True).exists()
+        assert Journal.objects.filter(pin_code__isnull=False).exists(), (
+            'Проверьте, что создаются журналы с PIN.'
+        )
+        assert not Journal.objects.filter(
+            is_private=False, pin_code__isnull=False).exists()
+        assert not Post.objects.filter(journal__is_private=True,
+                                       is_private=False).exists(), (
+            'Проверьте, что посты приватных журналов приватны.'
+        )
+        assert Post.objects.exclude(image='').exclude(
+            image_thumbnail='').exists(), (
+            'Проверьте, что часть постов создаётся с изображениями '
+            'и готовыми вариантами.'
+        )
+        for journal in Journal.objects.all():
+            assert journal.post_count == journal.posts.count(), (
+                'Проверьте, что счётчики постов журналов верны.'
+            )
+        followers = Counter(Follow.objects.values_list(
+            'following_id', flat=True))
+        top = followers.most_common(1)[0][1]
+        assert top >= 3 * Follow.objects.count() / 40, (
+            'Проверьте, что число подписчиков распределено неравномерно.'
+        )
+        assert TimelineEntry.objects.exists()
+        word = Post.objects.first().text.split()[0]
+        assert get_search_backend().search(Post.objects.all(),
+                                           word).exists(), (
+            'Проверьте, что посты попадают в поисковый индекс.'
+        )
+
+    def test_deterministic(self):
+        self.seed(prefix='a')
+        first = list(Post.objects.order_by('pk').values_list(
+            'text', 'is_private'))
+        self.seed(prefix='b')
+        second = list(Post.objects.order_by('pk').values_list(
+            'text', 'is_private'))[len(first):]
+        assert first == second, (
+            'Проверьте, что при одном `seed` данные совпадают.'
+        )
@@ -0,0 +1,92 @@
+import io
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from journals import slow_queries
+from posts.models import Post
+
+
+def test_normalize():
+    first = slow_queries.normalize(
+        'SELECT * FROM "posts_post" WHERE "posts_post"."id" IN (%s, %s)\n'
+        "  AND text = 'a''b' LIMIT 21")
+    assert first == ('SELECT * FROM "posts_post" WHERE "posts_post"."id" '
+                     'IN (...) AND text = ? LIMIT ?')
+    assert first == slow_queries.normalize(
+        'SELECT * FROM "posts_post" WHERE "posts_post"."id" IN (%s) '
+        "AND text = 'c' LIMIT 100"), (
+        'Проверьте, что запросы одной формы дают один отпечаток.'
+    )
+
+
+def test_off_by_default(settings):
+    settings.SLOW_QUERY_LOG = dict(settings.SLOW_QUERY_LOG,
+                                   THRESHOLD_MS=None)
+    fake_connection = SimpleNamespace(execute_wrappers=[])
+    slow_queries.install_on_connect(None, fake_connection)
+    assert fake_connection.execute_wrappers == [], (
+        'Проверьте, что без порога обёртка журнала не ставится.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSlowQueryLog:
+
+    @pytest.fixture(autouse=True)
+    def log_everything(self, settings, tmp_path):
+        # По умолчанию журнал выключен и обёртка не ставится.
+        slow_queries.install(connection)
+        settings.SLOW_QUERY_LOG = {
+            'THRESHOLD_MS': 0,
+            'PATH': str(tmp_path / 'slow.jsonl'),
+            'EXPLAIN': True,
+        }
+        return settings.SLOW_QUERY_LOG['PATH']
+
+    @pytest.fixture
+    def post(self, user, journal):
+        return Post.objects.create(text='Пост', author=user, journal=journal)
+
+    def test_entries(self, user_client, post, log_everything):
+        user_client.get('/api/v1/posts/?author__username=TestUser')
+        user_client.get('/api/v1/posts/?author__username=Другой')
+        entries = [entry for entry in slow_queries.read(log_everything)
+                   if '"posts_post"' in entry['sql']
+                   and entry['view'] == 'post-list']
+        assert len(entries) >= 2, (
+            'Проверьте, что запросы представления попадают в журнал '
+            'с его именем.'
+        )
+        fingerprints = Counter(entry['fingerprint'] for entry in entries)
+        assert set(fingerprints.values()) == {2}, (
+            'Проверьте, что отпечаток не зависит от значений параметров.'
+        )
+        assert entries[0]['plan'], (
+            'Проверьте, что для SELECT сохраняется план EXPLAIN.'
+        )
+        assert "'TestUser'" not in entries[0]['sql']
+
+    def test_explain_not_counted(self, user_client, post, settings):
+        user_client.get('/api/v1/posts/')
+        with CaptureQueriesContext(connection) as logged:
+            user_client.get('/api/v1/posts/')
+        settings.SLOW_QUERY_LOG = dict(settings.SLOW_QUERY_LOG,
+                                       THRESHOLD_MS=None)
+        with CaptureQueriesContext(connection) as plain:
+            user_client.get('/api/v1/posts/')
+        assert len(logged) == len(plain), (
+            'Проверьте, что EXPLAIN не выполняется через обёртки Django.'
+        )
+
+    def test_summary_command(self, user_client, post, log_everything):
+        user_client.get('/api/v1/posts/')
+        out = io.StringIO()
+        call_command('slow_queries', top=20, view='post-list', stdout=out)
+        output = out.getvalue()
+        assert 'Представления: post-list' in output
+        assert 'posts_post' in output
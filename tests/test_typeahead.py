@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class TestUserTypeahead:
+
+    url = '/api/v1/users/typeahead/'
+
+    @pytest.fixture
+    def users(self, django_user_model):
+        return [
+            django_user_model.objects.create_user(username=username)
+            for username in ('Alice', 'alex', 'Albert', 'bob', 'Алёна',
+                             'алиса')
+        ]
+
+    def search(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response.json()
+
+    def test_prefix_case_insensitive(self, client, users):
+        results = self.search(client, q='AL')
+        assert [item['username'] for item in results] == [
+            'Albert', 'alex', 'Alice'], (
+            'Проверьте, что поиск находит пользователей по началу имени '
+            'без учёта регистра, по алфавиту.'
+        )
+        assert set(results[0]) == {'id', 'username'}, (
+            'Проверьте, что ответ содержит только `id` и `username`.'
+        )
+        assert {item['username'] for item in self.search(client, q='АЛ')} \
+            == {'Алёна', 'алиса'}, (
+            'Проверьте, что поиск без учёта регистра работает для '
+            'не-ASCII имён.'
+        )
+
+    def test_limit_is_capped(self, client, users, settings):
+        settings.USER_TYPEAHEAD = dict(settings.USER_TYPEAHEAD, MAX_LIMIT=2)
+        assert len(self.search(client, q='a', limit=100)) == 2, (
+            'Проверьте, что число результатов ограничено `MAX_LIMIT`.'
+        )
+        assert self.search(client, q='') == []
+
+    def test_renamed_user(self, client, users):
+        users[3].username = 'Bobby'
+        users[3].save()
+        assert [item['username'] for item in self.search(client, q='bobb')] \
+            == ['Bobby'], (
+            'Проверьте, что смена имени пользователя попадает в поиск.'
+        )
+
+    def test_cached_prefix(self, client, users, django_assert_num_queries):
+        self.search(client, q='al')
+        with django_assert_num_queries(0):
+            self.search(client, q='al')
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite',
+                        reason='Проверяется план SQLite.')
+    def test_uses_index(self, client, users):
+        with CaptureQueriesContext(connection) as context:
+            self.search(client, q='al')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'EXPLAIN QUERY PLAN {context.captured_queries[-1]["sql"]}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        assert any('username_lower' in step and 'INDEX' in step
+                   for step in plan), (
+            f'Проверьте, что поиск идёт по индексу `username_lower`: {plan}'
+        )
+        assert not any('TEMP B-TREE' in step for step in plan)